@@ -0,0 +1,90 @@
+"""
+(guild_id, user_id, 날짜)별 누적 시간 인메모리 캐시 — SQLite는 write-through 저장소로만 쓴다
+
+daily_totals 에서 채운다 (월간 롤오버로 원본을 지워도 남으므로 달을 걸친 주도 온전하다).
+이번 주와 이번 달에 답할 만큼만 들고, 그보다 오래된 날은 trim() 으로 버린다.
+"""
+
+import calendar
+from datetime import date, datetime
+from collections import defaultdict
+from timeutil import KST, to_epoch_day
+
+
+def horizon(today):
+    # 캐시에 둘 가장 이른 날 — 이번 달 1일과 이번 주 월요일 중 이른 쪽, 그 전날까지
+    # (자정을 넘긴 퇴장의 전날 몫도 합계를 보여 줄 수 있게)
+    return min(to_epoch_day(today.replace(day=1)), to_epoch_day(today) - today.weekday()) - 1
+
+
+class AggregateCache:
+    def __init__(self, owns=None, today=lambda: datetime.now(KST).date()):
+        self._totals = defaultdict(int)  # (guild_id, user_id, epoch-day) -> 초
+        self._owns = owns                # owns(guild_id) — 샤딩할 때 이 프로세스가 맡은 길드만 싣는다
+        self._today = today
+        self._loading = None             # DB를 읽는 동안 들어온 add (아직 저널에만 있는 기록)
+
+    async def _load(self, db, since):
+        totals = {}
+        async with db.execute(
+            "SELECT guild_id, user_id, day, seconds FROM daily_totals WHERE day >= ? AND seconds > 0", (since,)
+        ) as cur:
+            async for guild_id, user_id, day, total in cur:
+                if self._owns is None or self._owns(guild_id):
+                    totals[(guild_id, user_id, day)] = total or 0
+        return totals
+
+    async def _snapshot(self, db, since):
+        # 읽는 사이 퇴장이 처리되면 캐시에는 바로 들어가지만 DB에는 아직 없다 — 그만큼 스냅샷에 더한다
+        # 읽는 동안 저널 flush 가 끼면 두 번 세므로 journal.flushed() 안에서 부른다
+        self._loading = defaultdict(int)
+        try:
+            totals = await self._load(db, since)
+        finally:
+            added, self._loading = self._loading, None
+        for key, seconds in added.items():
+            totals[key] = totals.get(key, 0) + seconds
+        return totals
+
+    async def warm(self, db):
+        totals = await self._snapshot(db, horizon(self._today()))
+        self._totals.clear()
+        self._totals.update(totals)
+
+    def add(self, guild_id, user_id, day, seconds):
+        self._totals[(guild_id, user_id, day)] += seconds
+        if self._loading is not None:
+            self._loading[(guild_id, user_id, day)] += seconds
+
+    def day(self, guild_id, user_id, d):
+        return self._totals.get((guild_id, user_id, to_epoch_day(d)), 0)
+
+    def week(self, guild_id, user_id, week_dates):
+        return sum(self.day(guild_id, user_id, d) for d in week_dates)
+
+    def month(self, guild_id, user_id, year, month):
+        first = to_epoch_day(date(year, month, 1))
+        days = calendar.monthrange(year, month)[1]
+        return sum(self._totals.get((guild_id, user_id, first + i), 0) for i in range(days))
+
+    def trim(self):
+        # 이번 주·이번 달에 쓰이지 않는 날을 버린다 (월간 롤오버 뒤에 부른다)
+        since = horizon(self._today())
+        for key in [k for k in self._totals if k[2] < since]:
+            del self._totals[key]
+
+    async def check_consistency(self, db, repair=True):
+        # DB와 다른 (guild_id, user_id, 날짜) 목록을 돌려주고, repair면 DB 값으로 맞춘다
+        since = horizon(self._today())
+        actual = await self._snapshot(db, since)
+
+        mismatches = []
+        for key in set(actual) | {k for k, v in self._totals.items() if v and k[2] >= since}:
+            cached, real = self._totals.get(key, 0), actual.get(key, 0)
+            if abs(cached - real) >= 1:
+                mismatches.append((key, cached, real))
+
+        if repair and mismatches:
+            self._totals.clear()
+            self._totals.update(actual)
+        return mismatches
@@ -0,0 +1,166 @@
+"""
+출석 기록 내보내기 / 가져오기 — 봇이 쓰는 중에도 DB 파일을 복사하지 않고 백업·분석할 수 있게
+
+    내보내기: 읽기 전용 커넥션에서 커서로 chunk씩 읽어 gzip CSV 또는 JSONL로 스트리밍 (메모리 일정)
+    가져오기: 먼저 파일 전체를 검사한 뒤, chunk씩 읽어 chunk마다 한 트랜잭션으로 executemany
+              (guild_id, user_id, check_in) 고유 키로 이미 있는 행은 건너뛰므로 여러 번 가져와도 같다
+
+형식은 파일 이름으로 정한다: *.csv.gz / *.jsonl.gz (월간 롤오버 보관 파일도 그대로 가져올 수 있다)
+
+    python backup.py export data/attendance.db backup.csv.gz [guild_id]
+    python backup.py import data/attendance.db backup.csv.gz [guild_id]
+"""
+
+import os
+import sys
+import csv
+import gzip
+import json
+import asyncio
+import aiosqlite
+from db import Database
+import migrations
+import rollover
+
+EXPORT_COLUMNS = rollover.ROW_COLUMNS  # id 는 참고용 — 가져올 때는 새로 매긴다
+IMPORT_COLUMNS = ("guild_id", "user_id", "check_in", "check_out", "duration", "day")
+_TYPES = {"guild_id": int, "user_id": int, "check_in": float, "check_out": float, "duration": float, "day": int}
+
+
+def _format_of(path):
+    if path.endswith(".csv.gz"):
+        return "csv"
+    if path.endswith(".jsonl.gz"):
+        return "jsonl"
+    raise ValueError("파일 이름은 .csv.gz 또는 .jsonl.gz 로 끝나야 합니다")
+
+
+# ──────────────────────────────────────────
+# 내보내기
+# ──────────────────────────────────────────
+async def export_attendance(db, path, guild_id=None, chunk_size=5000):
+    # db 는 읽기 커넥션 (봇: database.read(), CLI: mode=ro) — 쓰기 커넥션을 막지 않는다
+    fmt = _format_of(path)
+    where, params = ("WHERE guild_id = ? ", (guild_id,)) if guild_id is not None else ("", ())
+    tmp_path = path + ".tmp"
+    count = 0
+    with gzip.open(tmp_path, "wt", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f) if fmt == "csv" else None
+        if writer:
+            writer.writerow(EXPORT_COLUMNS)
+        async with db.execute(
+            f"SELECT {', '.join(EXPORT_COLUMNS)} FROM attendance {where}ORDER BY id", params
+        ) as cur:
+            while rows := await cur.fetchmany(chunk_size):
+                if writer:
+                    writer.writerows(rows)
+                else:
+                    f.writelines(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n" for row in rows)
+                count += len(rows)
+    os.replace(tmp_path, path)
+    return count
+
+
+# ──────────────────────────────────────────
+# 가져오기
+# ──────────────────────────────────────────
+def read_rows(path, guild_id=None):
+    # 한 줄씩 읽어 IMPORT_COLUMNS 순서의 튜플로 — guild_id 를 주면 그 길드로 덮어쓴다
+    fmt = _format_of(path)
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        records = csv.DictReader(f) if fmt == "csv" else (json.loads(line) for line in f if line.strip())
+        for line, record in enumerate(records, 1):
+            if guild_id is not None:
+                record["guild_id"] = guild_id
+            record.setdefault("guild_id", 0)  # 길드 구분 전 보관 파일
+            try:
+                row = tuple(_TYPES[c](record[c]) for c in IMPORT_COLUMNS)
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"{line}번째 기록을 읽을 수 없습니다 ({type(e).__name__}: {e})") from e
+            yield row
+
+
+def validate_file(path, guild_id=None):
+    # 쓰기 전에 파일 전체를 한 번 읽어 본다 — 중간에 깨진 행이 있으면 아무것도 넣지 않고 ValueError
+    # (한 줄씩 읽으므로 메모리는 일정, 대신 파일을 두 번 읽는다)
+    try:
+        return sum(1 for _ in read_rows(path, guild_id))
+    except (OSError, EOFError, csv.Error) as e:
+        raise ValueError(f"파일을 읽을 수 없습니다 ({type(e).__name__}: {e})") from e
+
+
+async def import_attendance(database, rows, chunk_size=5000):
+    # chunk마다 한 트랜잭션 — 이미 있는 (guild_id, user_id, check_in) 은 무시
+    # 들어간 날짜 범위의 daily_totals 는 롤오버처럼 원본 합계로 다시 맞춘다.
+    # hourly_totals 는 건드리지 않는다 (보관 파일을 되살릴 때 시간대 분포를 두 번 세지 않도록).
+    read, inserted = 0, 0  # inserted: PostgreSQL에서는 알 수 없어 None
+    touched = {}  # guild_id -> [처음 날짜, 마지막 날짜]
+    chunk = []
+
+    async def flush():
+        nonlocal inserted
+        async with database.write() as db:
+            cur = await db.executemany(
+                "INSERT OR IGNORE INTO attendance (guild_id, user_id, check_in, check_out, duration, day) "
+                "VALUES (?,?,?,?,?,?)", chunk
+            )
+            if cur is None:
+                inserted = None
+            else:
+                if inserted is not None:
+                    inserted += max(cur.rowcount, 0)
+                await cur.close()
+        chunk.clear()
+
+    try:
+        for row in rows:
+            chunk.append(row)
+            read += 1
+            guild_id, day = row[0], row[5]
+            span = touched.setdefault(guild_id, [day, day])
+            span[0], span[1] = min(span[0], day), max(span[1], day)
+            if len(chunk) >= chunk_size:
+                await flush()
+        if chunk:
+            await flush()
+    finally:
+        # 중간에 실패해도 이미 커밋된 chunk 의 합계는 맞춰 둔다
+        if touched:
+            async with database.write() as db:
+                for guild_id, (start_day, end_day) in touched.items():
+                    await rollover.compact_into_daily_totals(db, guild_id, start_day, end_day)
+    return {"read": read, "inserted": inserted}
+
+
+# ──────────────────────────────────────────
+# 단독 실행
+# ──────────────────────────────────────────
+async def _export_file(db_path, out_path, guild_id):
+    async with aiosqlite.connect(f"file:{db_path}?mode=ro", uri=True) as db:
+        return await export_attendance(db, out_path, guild_id)
+
+
+async def _import_file(db_path, in_path, guild_id):
+    database = Database(db_path, readers=1)
+    await database.open()
+    try:
+        async with database.write() as db:
+            await migrations.migrate(db)
+        validate_file(in_path, guild_id)
+        return await import_attendance(database, read_rows(in_path, guild_id))
+    finally:
+        await database.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (4, 5) or sys.argv[1] not in ("export", "import"):
+        print("사용법: python backup.py export|import <DB 파일> <*.csv.gz | *.jsonl.gz> [guild_id]")
+        sys.exit(1)
+    command, db_path, file_path = sys.argv[1:4]
+    guild_id = int(sys.argv[4]) if len(sys.argv) == 5 else None
+    if command == "export":
+        count = asyncio.run(_export_file(db_path, file_path, guild_id))
+        print(f"내보내기 완료: {count}행 → {file_path}")
+    else:
+        result = asyncio.run(_import_file(db_path, file_path, guild_id))
+        print(f"가져오기 완료: 읽음 {result['read']}행, 추가 {result['inserted']}행")
@@ -0,0 +1,243 @@
+"""
+부하 재생 벤치마크 — 가짜 디스코드 객체로 이벤트 핸들러와 결산을 직접 돌려
+지연 시간(p50/p99), 이벤트당 쿼리 수, DB 크기를 잰다 (배포 전 성능 회귀 확인용)
+
+    python bench.py                               # 1000명, 1년치 기록, 합성 이벤트 5000건
+    python bench.py --users 10000 --days 730      # 큰 길드, 2년치
+    python bench.py --replay events.jsonl         # 기록해 둔 이벤트 재생
+
+재생 파일은 한 줄에 하나씩 {"user_id": 123, "op": "join" | "leave"}
+실제 data/ 는 건드리지 않고 임시 폴더(또는 --dir)에 DB를 만든다.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+import config
+from timeutil import KST
+
+GUILD_ID = 1
+VOICE_ID = 10
+TEXT_ID = 11
+
+
+# ──────────────────────────────────────────
+# 가짜 디스코드 객체
+# ──────────────────────────────────────────
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.members = []
+        self.sent = 0
+
+    async def send(self, content=None, embed=None, **kwargs):
+        self.sent += 1
+
+
+class FakeMember:
+    bot = False
+
+    def __init__(self, user_id, guild):
+        self.id = user_id
+        self.guild = guild
+        self.display_name = f"user{user_id}"
+        self.mention = f"<@{user_id}>"
+
+
+class FakeGuild:
+    def __init__(self, guild_id, channels):
+        self.id = guild_id
+        self.channels = {c.id: c for c in channels}
+        self.members = {}
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+
+class FakeVoiceState:
+    def __init__(self, channel):
+        self.channel = channel
+
+
+# ──────────────────────────────────────────
+# 측정
+# ──────────────────────────────────────────
+class QueryCounter:
+    # Database.on_query 에 끼워 execute/executemany 호출 수를 센다 (원래 훅도 그대로 부름)
+    def __init__(self):
+        self.count = 0
+        self._next = None
+
+    def __call__(self):
+        self.count += 1
+        if self._next:
+            self._next()
+
+    def attach(self, database):
+        self._next = database.on_query
+        database.on_query = self
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def summarize(name, samples):
+    ms = [s * 1000 for s in samples]
+    return f"{name:<24} n={len(ms):<6} p50={percentile(ms, 50):8.3f}ms  p99={percentile(ms, 99):8.3f}ms  max={max(ms):8.3f}ms"
+
+
+def db_size(path):
+    return sum(os.path.getsize(p) for p in (path, f"{path}-wal") if os.path.exists(p))
+
+
+# ──────────────────────────────────────────
+# 합성 데이터
+# ──────────────────────────────────────────
+def synthetic_history(users, days, rate, now):
+    # 사용자마다 하루 rate 확률로 30분~6시간 세션 하나
+    for d in range(days, 0, -1):
+        day_start = now - timedelta(days=d)
+        for uid in users:
+            if random.random() < rate:
+                start = day_start + timedelta(minutes=random.randint(0, 20 * 60))
+                yield (GUILD_ID, uid, start.timestamp(), (start + timedelta(minutes=random.randint(30, 360))).timestamp())
+
+
+def synthetic_events(users, count):
+    # 무작위 사용자가 들어오거나 나간다 — 들어와 있으면 나가고, 아니면 들어온다
+    inside = set()
+    for _ in range(count):
+        uid = random.choice(users)
+        if uid in inside:
+            inside.discard(uid)
+            yield {"user_id": uid, "op": "leave"}
+        else:
+            inside.add(uid)
+            yield {"user_id": uid, "op": "join"}
+
+
+def recorded_events(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# ──────────────────────────────────────────
+# 실행
+# ──────────────────────────────────────────
+async def run(args):
+    import main
+    from guilds import GuildSettings
+
+    voice, text = FakeChannel(VOICE_ID), FakeChannel(TEXT_ID)
+    guild = FakeGuild(GUILD_ID, [voice, text])
+    users = list(range(1000, 1000 + args.users))
+    guild.members = {uid: FakeMember(uid, guild) for uid in users}
+
+    await main.init_db()
+    await main.guild_registry.save(main.database, GuildSettings(GUILD_ID, [VOICE_ID], TEXT_ID))
+
+    now = datetime.now(KST)
+    started = time.perf_counter()
+    batch, rows = [], 0
+    for session in synthetic_history(users, args.days, args.rate, now):
+        batch.append(session)
+        if len(batch) >= 10000:
+            async with main.database.write() as db:
+                await main.save_sessions(db, batch)
+            rows += len(batch)
+            batch = []
+    if batch:
+        async with main.database.write() as db:
+            await main.save_sessions(db, batch)
+        rows += len(batch)
+    async with main.database.read() as db:
+        await main.aggregates.warm(db)
+    print(f"기록 생성: 세션 {rows}건, {time.perf_counter() - started:.1f}초, DB {db_size(config.DATABASE_NAME) / 1e6:.1f}MB")
+
+    queries = QueryCounter()
+    queries.attach(main.database)
+
+    events = recorded_events(args.replay) if args.replay else synthetic_events(users, args.events)
+    handler_samples, handled = [], 0
+    for event in events:
+        member = guild.members.get(event["user_id"]) or FakeMember(event["user_id"], guild)
+        if event["op"] == "join":
+            voice.members.append(member)
+            before, after = FakeVoiceState(None), FakeVoiceState(voice)
+        else:
+            if member in voice.members:
+                voice.members.remove(member)
+            before, after = FakeVoiceState(voice), FakeVoiceState(None)
+        t0 = time.perf_counter()
+        await main.on_voice_state_update(member, before, after)
+        handler_samples.append(time.perf_counter() - t0)
+        handled += 1
+    main.leaves.flush()  # 유예 중인 퇴장까지 처리한 뒤 반영
+    await main.journal.flush()
+    event_queries = queries.count
+
+    week_dates = main.get_week_dates(now.date())
+    weekly_samples, monthly_samples = [], []
+    weekly_queries = monthly_queries = 0
+    for _ in range(args.reports):
+        q0, t0 = queries.count, time.perf_counter()
+        await main.build_weekly_embeds(guild, week_dates)
+        weekly_samples.append(time.perf_counter() - t0)
+        weekly_queries += queries.count - q0
+
+        q0, t0 = queries.count, time.perf_counter()
+        await main.build_monthly_report(guild, now.year, now.month)
+        monthly_samples.append(time.perf_counter() - t0)
+        monthly_queries += queries.count - q0
+
+    print(f"사용자 {args.users}명, 이벤트 {handled}건 (끊김 병합 {main.leaves.merged}건), 발신 큐 {main.outbox.depth()}건 대기")
+    print(summarize("on_voice_state_update", handler_samples))
+    print(summarize("build_weekly_embeds", weekly_samples))
+    print(summarize("build_monthly_report", monthly_samples))
+    print(f"이벤트당 쿼리: {event_queries / max(handled, 1):.2f}  (저널 반영 {main.journal.flushes}회)")
+    print(f"결산 1회당 쿼리: 주간 {weekly_queries / args.reports:.1f}, 월간 {monthly_queries / args.reports:.1f}")
+    print(f"DB 크기: {db_size(config.DATABASE_NAME) / 1e6:.1f}MB")
+    print("\n".join(main.metrics.render_text()))
+
+    await main.bot.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="출석 봇 부하 재생 벤치마크")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365, help="합성 기록 기간 (일)")
+    parser.add_argument("--rate", type=float, default=0.3, help="사용자별 하루 출석 확률")
+    parser.add_argument("--events", type=int, default=5000, help="합성 음성 이벤트 수")
+    parser.add_argument("--replay", help="재생할 이벤트 JSONL 파일")
+    parser.add_argument("--reports", type=int, default=20, help="결산 생성 반복 횟수 (1 이상)")
+    parser.add_argument("--dir", help="DB를 만들 폴더 (기본: 임시 폴더)")
+    # 재생은 실제 시간이 거의 흐르지 않으므로 유예를 주면 퇴장 대부분이 재접속으로 합쳐지고
+    # 나머지는 측정 밖(leaves.flush)에서 처리된다 — 기본은 0으로 퇴장 경로까지 재도록
+    parser.add_argument("--grace", type=float, default=0, help="퇴장 유예 (초, 기본 0)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    workdir = args.dir or tempfile.mkdtemp(prefix="attendance-bench-")
+    # main 을 불러오기 전에 경로를 바꿔야 실제 DB/저널을 건드리지 않는다
+    config.DATABASE_URL = ""
+    config.DATABASE_NAME = os.path.join(workdir, "attendance.db")
+    config.JOURNAL_PATH = os.path.join(workdir, "sessions.journal")
+    config.ARCHIVE_DIR = os.path.join(workdir, "archive")
+    config.METRICS_FILE = None
+    config.LEAVE_GRACE_SECONDS = args.grace
+    print(f"작업 폴더: {workdir}", file=sys.stderr)
+    asyncio.run(run(args))
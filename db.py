@@ -0,0 +1,111 @@
+"""
+SQLite 연결 계층 — 봇이 떠 있는 동안 커넥션을 한 번만 연다
+(WAL 모드, 읽기 전용 풀 + 직렬화된 단일 쓰기 커넥션)
+"""
+
+import os
+import asyncio
+from contextlib import asynccontextmanager
+import aiosqlite
+
+
+async def _pragma(conn, stmt):
+    # 커서를 바로 닫아야 문장이 리셋되어 잠금이 남지 않는다
+    async with conn.execute(f"PRAGMA {stmt}") as cur:
+        return await cur.fetchall()
+
+
+class _Counted:
+    # execute/executemany 를 부를 때마다 on_query() — 나머지는 커넥션 그대로
+    __slots__ = ("_conn", "_on_query")
+
+    def __init__(self, conn, on_query):
+        self._conn = conn
+        self._on_query = on_query
+
+    def execute(self, sql, parameters=None):
+        self._on_query()
+        return self._conn.execute(sql, parameters)
+
+    def executemany(self, sql, parameters):
+        self._on_query()
+        return self._conn.executemany(sql, parameters)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class Database:
+    dialect = "sqlite"
+
+    def __init__(self, path, readers=3):
+        self.path = path
+        self.readers = readers
+        self._writer = None
+        self._write_lock = asyncio.Lock()
+        self._pool = None
+        self._reader_conns = []
+        self.on_query = None  # 쿼리마다 부를 함수 (계측용) — 부른 쪽 task 안에서 호출된다
+
+    @property
+    def is_open(self):
+        return self._writer is not None
+
+    async def _connect(self):
+        conn = await aiosqlite.connect(self.path)
+        await _pragma(conn, "busy_timeout=5000")
+        await _pragma(conn, "synchronous=NORMAL")
+        return conn
+
+    async def open(self):
+        if self.is_open:
+            return
+        dirname = os.path.dirname(self.path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+
+        self._writer = await self._connect()
+        await _pragma(self._writer, "journal_mode=WAL")
+
+        self._pool = asyncio.Queue()
+        for _ in range(self.readers):
+            conn = await self._connect()
+            await _pragma(conn, "query_only=ON")
+            self._reader_conns.append(conn)
+            self._pool.put_nowait(conn)
+
+    @asynccontextmanager
+    async def read(self):
+        conn = await self._pool.get()
+        try:
+            yield _Counted(conn, self.on_query) if self.on_query else conn
+        finally:
+            self._pool.put_nowait(conn)
+
+    @asynccontextmanager
+    async def write(self):
+        # 쓰기는 한 번에 하나씩 — 블록이 끝나면 커밋, 예외면 롤백
+        async with self._write_lock:
+            try:
+                yield _Counted(self._writer, self.on_query) if self.on_query else self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+            else:
+                await self._writer.commit()
+
+    async def close(self):
+        if not self.is_open:
+            return
+        async with self._write_lock:
+            # 빌려간 읽기 커넥션이 모두 돌아올 때까지 기다린 뒤 닫는다
+            for _ in self._reader_conns:
+                conn = await self._pool.get()
+                await conn.close()
+            self._reader_conns = []
+            self._pool = None
+
+            await self._writer.commit()
+            await _pragma(self._writer, "wal_checkpoint(TRUNCATE)")
+            await self._writer.close()
+            self._writer = None
@@ -0,0 +1,57 @@
+"""
+퇴장 유예 — 연결이 불안정해 잠깐 끊겼다 다시 들어오는 경우를 한 세션으로 합친다
+
+퇴장 이벤트를 바로 처리하지 않고 grace 초 동안 들고 있다가, 그 안에 다시 들어오면
+퇴장을 취소한다 (세션은 열린 그대로 이어지고 입·퇴장 멘트도 나가지 않는다).
+유예가 끝나면 원래 퇴장 시각으로 처리하므로 누적 시간에 유예 시간이 더해지지 않는다.
+"""
+
+import asyncio
+
+
+class LeaveDebouncer:
+    def __init__(self, grace):
+        self.grace = grace
+        self._pending = {}  # key -> (TimerHandle, 콜백)
+        self.merged = 0     # 다시 들어와서 합쳐진 횟수
+
+    def hold(self, key, callback):
+        # grace 가 0이면 유예 없이 바로
+        self.cancel(key)
+        if self.grace <= 0:
+            callback()
+            return
+        handle = asyncio.get_running_loop().call_later(self.grace, self._fire, key)
+        self._pending[key] = (handle, callback)
+
+    def _fire(self, key):
+        _, callback = self._pending.pop(key)
+        callback()
+
+    def cancel(self, key):
+        # 유예 중인 퇴장이 있었으면 True (합친 횟수로는 세지 않는다)
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return False
+        pending[0].cancel()
+        return True
+
+    def rejoin(self, key):
+        # 유예 중에 다시 들어옴 — 끊김으로 보고 세션을 잇는다
+        if not self.cancel(key):
+            return False
+        self.merged += 1
+        return True
+
+    def flush(self):
+        # 종료할 때 — 들고 있던 퇴장을 모두 지금 처리
+        pending, self._pending = self._pending, {}
+        for handle, callback in pending.values():
+            handle.cancel()
+            callback()
+
+    def __contains__(self, key):
+        return key in self._pending
+
+    def __len__(self):
+        return len(self._pending)
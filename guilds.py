@@ -0,0 +1,74 @@
+"""
+길드별 설정 — 추적할 음성 채널, 알림 채널, 주간 단계표 (guild_config 테이블)
+"""
+
+import json
+import config
+from render import tier_index
+
+
+class GuildSettings:
+    def __init__(self, guild_id, voice_channel_ids, text_channel_id=None, tiers=None):
+        self.guild_id = guild_id
+        self.voice_channel_ids = frozenset(voice_channel_ids)
+        self.text_channel_id = text_channel_id
+        self.tiers = tiers  # None이면 config.WEEKLY_TIERS
+        self.tier_index = tier_index(self.tier_table)
+
+    def tracks(self, channel):
+        return channel is not None and channel.id in self.voice_channel_ids
+
+    @property
+    def tier_table(self):
+        return self.tiers or config.WEEKLY_TIERS
+
+    def get_tier(self, total_seconds):
+        return self.tier_index.lookup(total_seconds)
+
+
+class GuildRegistry:
+    def __init__(self):
+        self._settings = {}
+
+    async def load(self, db):
+        async with db.execute(
+            "SELECT guild_id, voice_channel_ids, text_channel_id, tiers FROM guild_config"
+        ) as cur:
+            rows = await cur.fetchall()
+        self._settings = {
+            guild_id: GuildSettings(
+                guild_id, json.loads(voice_ids), text_id,
+                [tuple(t) for t in json.loads(tiers)] if tiers else None
+            )
+            for guild_id, voice_ids, text_id, tiers in rows
+        }
+
+    def get(self, guild_id):
+        return self._settings.get(guild_id)
+
+    def all(self):
+        return list(self._settings.values())
+
+    async def save(self, database, settings):
+        async with database.write() as db:
+            await db.execute(
+                "INSERT INTO guild_config (guild_id, voice_channel_ids, text_channel_id, tiers) VALUES (?,?,?,?) "
+                "ON CONFLICT (guild_id) DO UPDATE SET voice_channel_ids = excluded.voice_channel_ids, "
+                "text_channel_id = excluded.text_channel_id, tiers = excluded.tiers",
+                (
+                    settings.guild_id, json.dumps(sorted(settings.voice_channel_ids)),
+                    settings.text_channel_id, json.dumps(settings.tiers) if settings.tiers else None
+                )
+            )
+        self._settings[settings.guild_id] = settings
+
+    async def adopt_legacy(self, database, guild):
+        # 설정이 없는 길드가 config의 기존 채널을 갖고 있으면 그 설정으로 등록하고
+        # guild_id=0 으로 남아 있던 예전 기록을 이 길드로 옮긴다
+        if self.get(guild.id) or not guild.get_channel(config.VOICE_CHANNEL_ID):
+            return False
+        await self.save(database, GuildSettings(guild.id, [config.VOICE_CHANNEL_ID], config.TEXT_CHANNEL_ID))
+        async with database.write() as db:
+            for table in ("attendance", "active_sessions", "daily_totals", "hourly_totals"):
+                await db.execute(f"UPDATE {table} SET guild_id=? WHERE guild_id=0", (guild.id,))
+        return True
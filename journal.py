@@ -0,0 +1,240 @@
+"""
+write-behind 세션 저널 — 음성 이벤트는 메모리 + 추가 전용 파일에 기록하고 바로 응답,
+SQLite에는 N ms 또는 M건마다 한 트랜잭션으로 몰아서 반영한다
+
+크래시가 나도 저널 파일에 남은 이벤트 중 DB에 반영되지 않은 것(seq 기준)을
+다음 시작 때 다시 적용하므로 출석 기록이 사라지지 않는다.
+"""
+
+import os
+import json
+import asyncio
+import traceback
+from contextlib import asynccontextmanager
+from presence import PresenceIndex
+
+
+class SessionJournal:
+    def __init__(self, database, path, on_close, name="main",
+                 flush_interval=0.5, flush_events=50, fsync=False):
+        self.database = database
+        self.path = path
+        self.name = name  # 프로세스마다 따로 — journal_state 행과 저널 파일을 구분
+        self.on_close = on_close  # async on_close(db, [(guild_id, user_id, check_in_ts, check_out_ts), ...])
+        self.flush_interval = flush_interval
+        self.flush_events = flush_events
+        self.fsync = fsync
+        self.active = PresenceIndex()  # 열린 세션 (DB에 반영됐든 아니든 현재 상태)
+        self._pending = []
+        self._seq = 0
+        self._file = None
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task = None
+        self.flushed_events = 0
+        self.flushes = 0
+
+    @property
+    def rotated_path(self):
+        return self.path + ".flushing"
+
+    # ── 시작 / 종료 ──
+    async def open(self):
+        dirname = os.path.dirname(self.path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+
+        async with self.database.read() as db:
+            async with db.execute("SELECT applied_seq FROM journal_state WHERE name=?", (self.name,)) as cur:
+                row = await cur.fetchone()
+        applied = row[0] if row else 0
+
+        # 이전 실행에서 DB에 못 들어간 이벤트 재적용
+        replay = [e for e in self._read_events() if e["seq"] > applied]
+        self._seq = max([applied] + [e["seq"] for e in replay])
+        if replay:
+            await self._apply(replay)
+            print(f"저널 재적용: {len(replay)}건")
+        for p in (self.path, self.rotated_path):
+            if os.path.exists(p):
+                os.remove(p)
+
+        await self.reload()
+
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._task = asyncio.create_task(self._run())
+
+    async def reload(self):
+        # DB의 열린 세션으로 메모리 상태를 다시 채운다 (대기 중인 이벤트가 없을 때만 호출)
+        async with self.database.read() as db:
+            async with db.execute("SELECT guild_id, user_id, check_in FROM active_sessions") as cur:
+                self.active.load(await cur.fetchall())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _read_events(self):
+        events = []
+        for p in (self.rotated_path, self.path):
+            if not os.path.exists(p):
+                continue
+            with open(p, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break  # 크래시로 잘린 마지막 줄
+        return events
+
+    # ── 이벤트 기록 ──
+    def _append(self, event):
+        self._seq += 1
+        event["seq"] = self._seq
+        self._file.write(json.dumps(event) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._pending.append(event)
+        self._wake.set()
+        if len(self._pending) >= self.flush_events:
+            self._full.set()
+
+    def join(self, guild_id, user_id, ts):
+        if not self.active.add(guild_id, user_id, ts):
+            return False
+        self._append({"op": "join", "guild_id": guild_id, "user_id": user_id, "ts": ts})
+        return True
+
+    def leave(self, guild_id, user_id, ts):
+        check_in = self.active.remove(guild_id, user_id)
+        if check_in is None:
+            return None
+        self._append({"op": "leave", "guild_id": guild_id, "user_id": user_id, "check_in": check_in, "ts": ts})
+        return check_in
+
+    # ── DB 반영 ──
+    async def _apply(self, events):
+        closed = []
+        async with self.database.write() as db:
+            for e in events:
+                key = (e.get("guild_id", 0), e["user_id"])
+                if e["op"] == "join":
+                    await db.execute(
+                        "INSERT OR IGNORE INTO active_sessions (guild_id, user_id, check_in) VALUES (?,?,?)",
+                        (*key, e["ts"])
+                    )
+                else:
+                    closed.append((*key, e["check_in"], e["ts"]))
+                    await db.execute("DELETE FROM active_sessions WHERE guild_id=? AND user_id=?", key)
+            if closed:
+                await self.on_close(db, closed)
+            await db.execute(
+                "INSERT INTO journal_state (name, applied_seq) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET applied_seq = excluded.applied_seq",
+                (self.name, events[-1]["seq"])
+            )
+
+    def _rotate(self):
+        if os.path.exists(self.rotated_path):
+            # 지난 flush가 실패해 남은 파일이 있으면 덮어쓰지 말고 이어 붙인다
+            with open(self.path, encoding="utf-8") as src, open(self.rotated_path, "a", encoding="utf-8") as dst:
+                dst.write(src.read())
+            os.remove(self.path)
+        else:
+            os.replace(self.path, self.rotated_path)
+
+    async def flush(self):
+        async with self._flush_lock:
+            return await self._flush_locked()
+
+    @asynccontextmanager
+    async def flushed(self):
+        # 대기 중인 이벤트를 DB에 반영하고, 블록이 끝날 때까지 다음 flush 를 막는다
+        # (DB 스냅샷과 메모리 상태를 맞출 때 — 그 사이 들어온 이벤트는 DB에 없다고 확신할 수 있게)
+        async with self._flush_lock:
+            await self._flush_locked()
+            yield
+
+    async def _flush_locked(self):
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, []
+        self._full.clear()
+
+        # 지금까지의 파일을 옆으로 치워 두고 새 파일에 이어 쓴다 — 커밋되면 치운 파일 삭제
+        if self._file:
+            self._file.close()
+            self._rotate()
+            self._file = open(self.path, "a", encoding="utf-8")
+
+        try:
+            await self._apply(batch)
+        except Exception:
+            # 실패한 묶음은 다음 flush에 다시 시도 (치운 파일도 그대로 남겨 둔다)
+            self._pending = batch + self._pending
+            raise
+        if os.path.exists(self.rotated_path):
+            os.remove(self.rotated_path)
+        self.flushes += 1
+        self.flushed_events += len(batch)
+        return len(batch)
+
+    async def reconcile(self, present, ts, guild_ids):
+        # 재시작 후 실제 음성 채널 인원(present: {(guild_id, user_id)})과 열린 세션을 맞춘다
+        # guild_ids 에 든 길드만 대상 — 한 트랜잭션, 일괄 문장
+        async with self._flush_lock:
+            await self._flush_locked()
+            closed = [
+                (*key, check_in, ts) for key, check_in in self.active.items()
+                if key[0] in guild_ids and key not in present
+            ]
+            opened = [(*key, ts) for key in present if key not in self.active]
+            if not closed and not opened:
+                return closed, opened
+
+            async with self.database.write() as db:
+                await db.executemany(
+                    "DELETE FROM active_sessions WHERE guild_id=? AND user_id=?",
+                    [(gid, uid) for gid, uid, _, _ in closed]
+                )
+                await db.executemany(
+                    "INSERT OR IGNORE INTO active_sessions (guild_id, user_id, check_in) VALUES (?,?,?)", opened
+                )
+                if closed:
+                    await self.on_close(db, closed)
+
+            for gid, uid, _, _ in closed:
+                self.active.remove(gid, uid)
+            for gid, uid, check_in in opened:
+                self.active.add(gid, uid, check_in)
+            return closed, opened
+
+    async def _run(self):
+        while True:
+            await self._wake.wait()
+            if not self._full.is_set():
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                traceback.print_exc()
+                await asyncio.sleep(self.flush_interval)
+                self._wake.set()
+
+    def depth(self):
+        return len(self._pending)
@@ -0,0 +1,38 @@
+"""
+DB 기반 리스(lease) — 여러 프로세스 중 하나만 어떤 일을 맡도록 하는 리더 선출
+
+만료 전까지는 잡고 있는 쪽만 갱신할 수 있고, 만료되면 누구든 가져갈 수 있다.
+SQLite와 PostgreSQL 모두 같은 upsert 문으로 동작한다.
+"""
+
+import socket
+import time
+
+
+def default_holder(instance):
+    # PID는 넣지 않는다 — 같은 자리에서 재시작한 프로세스가 TTL을 기다리지 않고 자기 리스를 다시 잡게
+    return f"{socket.gethostname()}:{instance}"
+
+
+class LeaseManager:
+    def __init__(self, database, holder, clock=time.time):
+        self.database = database
+        self.holder = holder
+        self.clock = clock
+
+    async def acquire(self, name, ttl):
+        now = self.clock()
+        async with self.database.write() as db:
+            await db.execute(
+                "INSERT INTO leases (name, holder, expires_at) VALUES (?,?,?) "
+                "ON CONFLICT (name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at "
+                "WHERE leases.holder = excluded.holder OR leases.expires_at < ?",
+                (name, self.holder, now + ttl, now)
+            )
+            async with db.execute("SELECT holder FROM leases WHERE name=?", (name,)) as cur:
+                row = await cur.fetchone()
+        return row is not None and row[0] == self.holder
+
+    async def release(self, name):
+        async with self.database.write() as db:
+            await db.execute("DELETE FROM leases WHERE name=? AND holder=?", (name, self.holder))
@@ -3,22 +3,48 @@
 """
 
 import os
+import time
 import random
-import calendar
+import asyncio
+import traceback
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from dotenv import load_dotenv
-import aiosqlite
-from datetime import datetime, timedelta, time, timezone
+from datetime import datetime, timedelta
 from collections import defaultdict
 import config
+import storage
+from aggregates import AggregateCache
+from timeutil import KST, fmt_time, get_week_dates, to_epoch_day, from_epoch_day, split_interval, split_sessions
+import report
+import migrations
+import rollover
+import rollups
+import backup
+from scheduler import Scheduler, Job, WeeklyAt, MonthlyAt
+from outbox import Outbox, split_message
+from journal import SessionJournal
+from guilds import GuildRegistry, GuildSettings
+from leases import LeaseManager, default_holder
+from render import NameCache, build_embeds, tier_index
+from metrics import Metrics
+from debounce import LeaveDebouncer
+from responses import ResponseCache
 
 print("★★★★★ 봇 실행! ★★★★★")
 
 load_dotenv()
 TOKEN = os.getenv("DISCORD_BOT_TOKEN")
+# 샤딩: SHARD_COUNT=4 SHARD_IDS=0,1 처럼 주면 이 프로세스는 그 샤드만 맡는다
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0")) or None
+SHARD_IDS = [int(i) for i in os.getenv("SHARD_IDS", "").split(",") if i.strip()] or None
+INSTANCE_NAME = "shards-" + "-".join(map(str, SHARD_IDS)) if SHARD_IDS else "main"
+
+
+def owns_guild(guild_id):
+    # 이 프로세스가 맡은 샤드의 길드인지 — 디스코드 규칙 (guild_id >> 22) % shard_count
+    return not SHARD_IDS or (guild_id >> 22) % SHARD_COUNT in SHARD_IDS
 
-KST = timezone(timedelta(hours=9))
 
 intents = discord.Intents.default()
 intents.voice_states = True
@@ -26,122 +52,176 @@ intents.members = True
 intents.message_content = True
 intents.guilds = True
 
-bot = commands.Bot(command_prefix=config.BOT_PREFIX, intents=intents)
-last_task_run = defaultdict(lambda: None)
+database = storage.open_database(config.DATABASE_URL or config.DATABASE_NAME, readers=config.DB_READ_POOL_SIZE)
+aggregates = AggregateCache(owns=owns_guild)
+guild_registry = GuildRegistry()
+names = NameCache()
+outbox = Outbox(
+    maxsize=config.OUTBOX_MAX_QUEUE,
+    rate=config.OUTBOX_RATE,
+    burst=config.OUTBOX_BURST,
+    coalesce_window=config.OUTBOX_COALESCE_WINDOW,
+)
+leases = LeaseManager(database, default_holder(INSTANCE_NAME))
+metrics = Metrics()
+leaves = LeaveDebouncer(config.LEAVE_GRACE_SECONDS)
+responses = ResponseCache(config.RESPONSE_CACHE_TTL, config.RESPONSE_CACHE_SIZE, config.RESPONSE_COOLDOWN)
+database.on_query = metrics.count_query
+
+
+class AttendanceBot(commands.AutoShardedBot if SHARD_COUNT else commands.Bot):
+    shutting_down = False
+
+    async def setup_hook(self):
+        # 로그인 직후, 게이트웨이 연결 전에 딱 한 번 — 재연결 때는 다시 불리지 않는다
+        await init_db()
+        await start_metrics()
+        self.startup_task = asyncio.create_task(finish_startup())
+
+    def dispatch(self, event_name, /, *args, **kwargs):
+        # 종료를 시작한 뒤에 들어온 이벤트는 버린다 — 닫히는 저널·발신 큐에 음성 이벤트가 끼지 않게
+        if self.shutting_down:
+            return
+        super().dispatch(event_name, *args, **kwargs)
+
+    async def close(self):
+        # 이벤트부터 막고 → 유예 중인 퇴장 → 저널 → 발신 큐 → 연결 → DB 순서로 닫는다
+        # (연결을 먼저 끊으면 HTTP 세션도 닫혀 퇴장 멘트를 보낼 수 없으므로 이벤트는 dispatch 에서 막는다)
+        self.shutting_down = True
+        await metrics.stop()
+        await scheduler.stop()
+        leaves.flush()
+        await journal.close()
+        await outbox.stop()
+        await super().close()
+        await database.close()
+
+
+if SHARD_COUNT:
+    bot = AttendanceBot(command_prefix=config.BOT_PREFIX, intents=intents,
+                        shard_count=SHARD_COUNT, shard_ids=SHARD_IDS)
+else:
+    bot = AttendanceBot(command_prefix=config.BOT_PREFIX, intents=intents)
 
 
 # ──────────────────────────────────────────
 # DB 초기화
 # ──────────────────────────────────────────
+startup_ready = asyncio.Event()  # 세션 동기화까지 끝나면 set — 그 전 명령어는 기다린다
+
+
+async def timed_phase(name, coro):
+    started = time.perf_counter()
+    result = await coro
+    elapsed = time.perf_counter() - started
+    metrics.observe(f"startup:{name}", elapsed)
+    print(f"  · {name}: {elapsed * 1000:.1f}ms")
+    return result
+
+
+async def migrate_schema():
+    await database.open()
+    async with database.write() as db:
+        applied = await migrations.migrate(db, database.dialect)
+    if applied:
+        print(f"DB 마이그레이션 적용: v{applied[0]} → v{applied[-1]}")
+
+
+async def load_guild_settings():
+    async with database.read() as db:
+        await guild_registry.load(db)
+
+
+async def load_sessions_and_cache():
+    # 저널 재적용이 끝난 뒤에 캐시를 데워야 크래시 직전 기록까지 포함된다
+    await journal.open()
+    async with database.read() as db:
+        await aggregates.warm(db)
+
+
 async def init_db():
-    import os
-    os.makedirs("data", exist_ok=True)
-    async with aiosqlite.connect(config.DATABASE_NAME) as db:
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS attendance (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT,
-                check_in TEXT,
-                check_out TEXT,
-                duration INTEGER,
-                check_in_date TEXT
-            )
-        """)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS active_sessions (
-                user_id TEXT PRIMARY KEY,
-                check_in TEXT
-            )
-        """)
-        await db.commit()
+    # 스키마 → (길드 설정 | 저널 재적용 → 누적 캐시) 를 동시에
+    started = time.perf_counter()
+    await timed_phase("schema", migrate_schema())
+    await asyncio.gather(
+        timed_phase("guild_config", load_guild_settings()),
+        timed_phase("journal_cache", load_sessions_and_cache()),
+    )
+    print(f"DB 준비 완료 ({(time.perf_counter() - started) * 1000:.1f}ms)")
 
 
 # ──────────────────────────────────────────
 # 헬퍼 함수
 # ──────────────────────────────────────────
-def fmt_time(seconds):
-    h, r = divmod(int(seconds), 3600)
-    m, _ = divmod(r, 60)
-    return f"{h}시간 {m:02d}분"
-
-
-def split_session_by_day(check_in, check_out):
-    sessions = []
-    current = check_in
-    while current.date() < check_out.date():
-        end = datetime.combine(current.date(), time(23, 59, 59), tzinfo=current.tzinfo)
-        sessions.append({
-            "check_in": current.isoformat(),
-            "check_out": end.isoformat(),
-            "duration": (end - current).total_seconds()
-        })
-        current = end + timedelta(seconds=1)
-    sessions.append({
-        "check_in": current.isoformat(),
-        "check_out": check_out.isoformat(),
-        "duration": (check_out - current).total_seconds()
-    })
-    return sessions
-
-
-async def save_session(db, user_id, check_in_iso, check_out):
-    check_in = datetime.fromisoformat(check_in_iso)
-    split_sessions = split_session_by_day(check_in, check_out)
-    for s in split_sessions:
-        await db.execute(
-            "INSERT INTO attendance (user_id, check_in, check_out, duration, check_in_date) VALUES (?,?,?,?,?)",
-            (
-                user_id,
-                s["check_in"], s["check_out"], s["duration"],
-                datetime.fromisoformat(s["check_in"]).date().isoformat()
-            )
-        )
-    return split_sessions
-
-
-async def get_duration_sum(db, user_id, date_str):
-    cur = await db.execute(
-        "SELECT SUM(duration) FROM attendance WHERE user_id=? AND check_in_date=?",
-        (user_id, date_str)
+@metrics.timed("db:save_sessions")
+async def save_sessions(db, sessions):
+    # 저널이 DB에 반영할 때 부르는 쪽 — 누적 캐시는 close_session에서 이미 갱신됨
+    # 같은 트랜잭션에서 통계용 합계(daily_totals / hourly_totals)도 함께 올린다
+    rows = split_sessions(sessions)
+    await db.executemany(
+        "INSERT INTO attendance (guild_id, user_id, check_in, check_out, duration, day) VALUES (?,?,?,?,?,?)",
+        rows
     )
-    row = await cur.fetchone()
-    return row[0] if row and row[0] else 0
+    await rollups.apply_rollups(db, rows)
 
 
-async def get_week_duration(db, user_id, week_dates):
-    placeholders = ",".join("?" for _ in week_dates)
-    cur = await db.execute(
-        f"SELECT SUM(duration) FROM attendance WHERE user_id=? AND check_in_date IN ({placeholders})",
-        [user_id] + [d.isoformat() for d in week_dates]
-    )
-    row = await cur.fetchone()
-    return row[0] if row and row[0] else 0
+def instance_path(path):
+    # 프로세스마다 저널 파일을 따로 — data/sessions.journal → data/sessions.shards-0-1.journal
+    if INSTANCE_NAME == "main":
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{INSTANCE_NAME}{ext}"
 
 
-async def get_month_duration(db, user_id, year, month):
-    start = f"{year}-{month:02d}-01"
-    end = f"{year}-{month:02d}-{calendar.monthrange(year, month)[1]}"
-    cur = await db.execute(
-        "SELECT SUM(duration) FROM attendance WHERE user_id=? AND check_in_date BETWEEN ? AND ?",
-        (user_id, start, end)
-    )
-    row = await cur.fetchone()
-    return row[0] if row and row[0] else 0
+journal = SessionJournal(
+    database, instance_path(config.JOURNAL_PATH), save_sessions, name=INSTANCE_NAME,
+    flush_interval=config.JOURNAL_FLUSH_INTERVAL,
+    flush_events=config.JOURNAL_FLUSH_EVENTS,
+    fsync=config.JOURNAL_FSYNC,
+)
 
 
-async def get_all_users_this_month(db, year, month):
-    start = f"{year}-{month:02d}-01"
-    end = f"{year}-{month:02d}-{calendar.monthrange(year, month)[1]}"
-    cur = await db.execute(
-        "SELECT DISTINCT user_id FROM attendance WHERE check_in_date BETWEEN ? AND ?",
-        (start, end)
-    )
-    return [row[0] for row in await cur.fetchall()]
+def open_session(guild_id, user_id, now):
+    return journal.join(guild_id, user_id, now.timestamp())
+
+
+def close_session(guild_id, user_id, check_out):
+    # 메모리에서 바로 세션을 닫고 누적 캐시 갱신 — DB 반영은 저널이 나중에 몰아서
+    check_in_ts = journal.leave(guild_id, user_id, check_out.timestamp())
+    if check_in_ts is None:
+        return None
+    pieces = split_interval(check_in_ts, check_out.timestamp())
+    for start, end, day in pieces:
+        aggregates.add(guild_id, user_id, day, end - start)
+    return pieces
+
+
+def get_duration_sum(guild_id, user_id, d):
+    return aggregates.day(guild_id, user_id, d)
+
+
+def get_week_duration(guild_id, user_id, week_dates):
+    return aggregates.week(guild_id, user_id, week_dates)
 
 
-def get_week_dates(ref_date):
-    monday = ref_date - timedelta(days=ref_date.weekday())
-    return [monday + timedelta(days=i) for i in range(7)]
+def get_month_duration(guild_id, user_id, year, month):
+    return aggregates.month(guild_id, user_id, year, month)
+
+
+def get_open_duration(guild_id, user_id, first, last, now):
+    # 아직 열려 있는 세션 중 first~last 날짜에 해당하는 시간 (누적 캐시에는 퇴장 때 들어감)
+    return journal.active.open_seconds(guild_id, user_id, to_epoch_day(first), to_epoch_day(last), now.timestamp())
+
+
+@metrics.timed("db:week_totals")
+async def get_week_totals(db, guild_id, week_dates):
+    # 하루 합계 테이블에서 — 달을 걸친 주는 지난달 원본이 롤오버로 지워졌어도 합계는 남아 있다
+    async with db.execute(
+        "SELECT user_id, SUM(seconds) FROM daily_totals WHERE guild_id = ? AND day BETWEEN ? AND ? "
+        "GROUP BY user_id HAVING SUM(seconds) > 0",
+        (guild_id, to_epoch_day(week_dates[0]), to_epoch_day(week_dates[-1]))
+    ) as cur:
+        return {row[0]: row[1] for row in await cur.fetchall()}
 
 
 def get_join_message(member, hour):
@@ -167,108 +247,147 @@ def get_leave_message(member, hour):
 # ──────────────────────────────────────────
 # 주간 결산 임베드
 # ──────────────────────────────────────────
-async def build_weekly_embed(guild, week_dates):
+def settings_for(guild):
+    return guild_registry.get(guild.id) if guild else None
+
+
+async def build_weekly_embeds(guild, week_dates):
+    settings = settings_for(guild)
     month = week_dates[0].month
     week_num = (week_dates[0].day - 1) // 7 + 1
     title = f"📊 {month}월 {week_num}주차 주간 결산"
     desc = "지난 한 주, 다들 얼마나 달렸나 봅시다 👀\n"
 
-    async with aiosqlite.connect(config.DATABASE_NAME) as db:
-        members_data = []
-        for member in guild.members:
-            if member.bot:
-                continue
-            total = await get_week_duration(db, str(member.id), week_dates)
-            if total > 0:
-                members_data.append((member, total))
-
-        if not members_data:
-            return discord.Embed(title=title, description="이번 주 기록이 없어요 😅", color=0x5865F2)
-
-        members_data.sort(key=lambda x: x[1], reverse=True)
-
-        groups = defaultdict(list)
-        for member, total in members_data:
-            emoji, label = config.get_weekly_tier(total)
-            groups[(emoji, label)].append((member, total))
-
-        embed = discord.Embed(title=title, description=desc, color=0x5865F2)
-
-        tier_order = [(e, l) for _, _, e, l in config.WEEKLY_TIERS]
-        for emoji, label in tier_order:
-            if (emoji, label) in groups:
-                lines = ""
-                for member, total in groups[(emoji, label)]:
-                    lines += f"{member.display_name}   {fmt_time(total)}\n"
-                embed.add_field(
-                    name=f"{emoji} {label} 그룹",
-                    value=lines,
-                    inline=False
-                )
-
-        mvp_member, mvp_time = members_data[0]
-        embed.add_field(
-            name="이번 주 MVP 🥇",
-            value=f"{mvp_member.mention} ({fmt_time(mvp_time)})",
-            inline=False
-        )
-        embed.set_footer(text=f"{month}월 {week_num + 1}주차도 달려봅시다 💪")
-        return embed
+    await journal.flush()
+    async with database.read() as db:
+        week_totals = await get_week_totals(db, guild.id, week_dates)
+
+    # 기록이 있는 user_id만 이름으로 변환 — 길드 인원수와 무관하게 한 번의 쿼리
+    members_data = []
+    for uid, total in week_totals.items():
+        name = names.resolve(guild, uid)
+        if name is not None:
+            members_data.append((uid, name, total))
+
+    if not members_data:
+        return [discord.Embed(title=title, description="이번 주 기록이 없어요 😅", color=0x5865F2)]
+
+    members_data.sort(key=lambda x: x[2], reverse=True)
+
+    groups = defaultdict(list)
+    for uid, name, total in members_data:
+        groups[settings.get_tier(total)].append(f"{name}   {fmt_time(total)}")
+
+    sections = [
+        (f"{emoji} {label} 그룹", groups[(emoji, label)])
+        for emoji, label in settings.tier_index.order if (emoji, label) in groups
+    ]
+    mvp_id, _, mvp_time = members_data[0]
+    sections.append(("이번 주 MVP 🥇", [f"<@{mvp_id}> ({fmt_time(mvp_time)})"]))
+
+    return build_embeds(
+        title, desc, sections, color=0x5865F2,
+        footer=f"{month}월 {week_num + 1}주차도 달려봅시다 💪"
+    )
 
 
 # ──────────────────────────────────────────
 # 월간 결산
 # ──────────────────────────────────────────
 async def build_monthly_report(guild, year, month):
-    async with aiosqlite.connect(config.DATABASE_NAME) as db:
-        user_ids = await get_all_users_this_month(db, year, month)
-        if not user_ids:
-            return f"📅 {month}월 기록이 없어요."
-
-        members_data = []
-        for uid in user_ids:
-            member = guild.get_member(int(uid))
-            if not member or member.bot:
-                continue
-            total = await get_month_duration(db, uid, year, month)
-            week_emojis = ""
-            for week in calendar.monthcalendar(year, month):
-                dates = [datetime(year, month, d).date() for d in week if d != 0]
-                week_total = await get_week_duration(db, uid, dates)
-                emoji, _ = config.get_weekly_tier(week_total)
-                week_emojis += emoji
-            members_data.append((member, total, week_emojis))
-
-        if not members_data:
-            return f"📅 {month}월 기록이 없어요."
-
-        members_data.sort(key=lambda x: x[1], reverse=True)
-
-        lines = [
-            f"🗓 **{month}월 월간 결산**",
-            "한 달 동안 정말 수고하셨어요 👏\n",
-            "🏅 **이달의 순위**\n"
-        ]
-
-        medals = ["🥇", "🥈", "🥉"]
-        for i, (member, total, week_emojis) in enumerate(members_data):
-            medal = medals[i] if i < 3 else f"{i+1}위"
-            lines.append(f"{medal} {member.display_name}   {fmt_time(total)}   {week_emojis}")
-
-        mvp = members_data[0][0]
-        lines.append(f"\n🏆 **이달의 MVP**   {mvp.mention} ({fmt_time(members_data[0][1])})")
-
-        for member, total, week_emojis in members_data:
-            if "⬜" not in week_emojis:
-                lines.append(f"🔥 **개근상**   {member.mention} (한 주도 빠지지 않음!)")
-                break
-
-        if len(members_data) > 1:
-            last = members_data[-1][0]
-            lines.append(f"📈 **다음 달엔 더 달려봐요**   {last.mention} 💪")
-
-        lines.append(f"\n---\n{month}월 데이터를 초기화합니다.\n{month + 1}월도 화이팅! 🚀")
-        return "\n".join(lines)
+    def resolve(uid):
+        name = names.resolve(guild, uid)
+        return report.OfflineMember(name, f"<@{uid}>") if name is not None else None
+
+    settings = settings_for(guild)
+    await journal.flush()
+    async with database.read() as db:
+        return await report.build_report_text(db, year, month, resolve, guild.id, settings.tiers)
+
+
+# ──────────────────────────────────────────
+# 재시작 동기화
+# ──────────────────────────────────────────
+def configured_guilds():
+    # 이 프로세스가 보고 있으면서 설정이 있는 길드
+    return [(g, guild_registry.get(g.id)) for g in bot.guilds if guild_registry.get(g.id)]
+
+
+async def adopt_legacy_guilds():
+    # 예전 단일 서버 기록(guild_id=0)을 기존 채널을 가진 길드로 옮기고 메모리 상태를 다시 읽는다
+    async with journal.flushed():
+        adopted = False
+        for guild in bot.guilds:
+            adopted |= await guild_registry.adopt_legacy(database, guild)
+        if adopted:
+            await journal.reload()
+            async with database.read() as db:
+                await aggregates.warm(db)
+
+
+async def reconcile_sessions():
+    # 꺼져 있던 동안의 입·퇴장을 한 번에 맞춘다 — 모든 길드를 모아 한 트랜잭션으로
+    started = time.perf_counter()
+    present, guild_ids = set(), set()
+    for guild, settings in configured_guilds():
+        guild_ids.add(guild.id)
+        for channel_id in settings.voice_channel_ids:
+            channel = guild.get_channel(channel_id)
+            if channel:
+                present.update((guild.id, m.id) for m in channel.members if not m.bot)
+    if not guild_ids:
+        return None
+    # 연결이 끊긴 사이 다시 들어온 사람의 유예 중인 퇴장은 취소
+    for key in present:
+        if leaves.cancel(key):
+            journal.active.stay(*key)
+
+    closed, opened = await journal.reconcile(present, datetime.now(KST).timestamp(), guild_ids)
+    for guild_id, user_id, check_in, check_out in closed:
+        for start, end, day in split_interval(check_in, check_out):
+            aggregates.add(guild_id, user_id, day, end - start)
+    for guild_id in {c[0] for c in closed}:
+        responses.invalidate(guild_id)
+
+    elapsed = time.perf_counter() - started
+    print(f"세션 동기화: 오프라인 중 퇴장 {len(closed)}건, 신규 세션 {len(opened)}건 ({elapsed * 1000:.1f}ms)")
+    return {"closed": len(closed), "opened": len(opened), "elapsed": elapsed}
+
+
+# ──────────────────────────────────────────
+# 계측
+# ──────────────────────────────────────────
+metrics.gauge("gateway_latency_seconds", lambda: bot.latency)
+metrics.gauge("outbox_depth", outbox.depth)
+metrics.gauge("outbox_dropped", lambda: outbox.dropped)
+metrics.gauge("journal_pending", journal.depth)
+metrics.gauge("journal_flushes", lambda: journal.flushes)
+metrics.gauge("open_sessions", lambda: len(journal.active))
+metrics.gauge("pending_leaves", lambda: len(leaves))
+metrics.gauge("merged_reconnects", lambda: leaves.merged)
+metrics.gauge("name_cache_hit_ratio", lambda: names.hit_ratio)
+metrics.gauge("response_cache_hit_ratio", lambda: responses.hit_ratio)
+metrics.gauge("response_cache_size", lambda: len(responses))
+
+
+@bot.before_invoke
+async def start_command_metrics(ctx):
+    ctx.metrics_handle = metrics.start(f"command:{ctx.command.qualified_name}")
+
+
+@bot.after_invoke
+async def finish_command_metrics(ctx):
+    handle = getattr(ctx, "metrics_handle", None)
+    if handle:
+        metrics.finish(handle, failed=ctx.command_failed)
+
+
+async def start_metrics():
+    if config.METRICS_PORT:
+        await metrics.serve(config.METRICS_HOST, config.METRICS_PORT)
+        print(f"계측 엔드포인트: http://{config.METRICS_HOST}:{config.METRICS_PORT}/metrics")
+    if config.METRICS_FILE:
+        metrics.start_writer(config.METRICS_FILE, config.METRICS_INTERVAL)
 
 
 # ──────────────────────────────────────────
@@ -276,188 +395,443 @@ async def build_monthly_report(guild, year, month):
 # ──────────────────────────────────────────
 @bot.event
 async def on_ready():
-    await init_db()
-    main_scheduler.start()
     print(f"✅ {bot.user} 로그인 성공!")
+    # 처음 한 번은 finish_startup 이 맡고, 재연결로 다시 오면 끊긴 동안의 음성 채널 변화만 맞춘다
+    if startup_ready.is_set():
+        await timed_phase("resync", reconcile_sessions())
 
-    for guild in bot.guilds:
-        voice_channel = guild.get_channel(config.VOICE_CHANNEL_ID)
-        if not voice_channel:
-            continue
 
-        async with aiosqlite.connect(config.DATABASE_NAME) as db:
-            current_members = {str(m.id) for m in voice_channel.members if not m.bot}
+async def finish_startup():
+    # 길드·음성 상태 캐시가 채워진 뒤(첫 on_ready)에만 할 수 있는 일
+    # 스케줄러도 여기서 — 길드 목록이 비어 있을 때 밀린 결산을 돌면 실행한 것으로 기록돼 버린다
+    await bot.wait_until_ready()
+    try:
+        await timed_phase("adopt_legacy", adopt_legacy_guilds())
+        await timed_phase("reconcile", reconcile_sessions())
+    except Exception:
+        # 동기화가 실패해도 봇은 계속 — 다음 재연결 때 다시 맞춘다
+        traceback.print_exc()
+    scheduler.start()
+    startup_ready.set()
+    print("시작 완료 — 명령어를 받습니다")
+
+
+@bot.check
+async def wait_for_startup(ctx):
+    # 시작 직후 들어온 명령어는 세션 동기화가 끝날 때까지 잠깐 기다린다
+    if startup_ready.is_set():
+        return True
+    try:
+        await asyncio.wait_for(startup_ready.wait(), timeout=config.STARTUP_COMMAND_WAIT)
+        return True
+    except asyncio.TimeoutError:
+        await ctx.send("⏳ 봇이 아직 시작 중이에요. 잠시 후 다시 시도해 주세요.")
+        return False
+
+
+@bot.event
+async def on_member_update(before, after):
+    if before.display_name != after.display_name:
+        names.invalidate(after.guild.id, after.id)
+        responses.invalidate(after.guild.id, after.id)
+
+
+@bot.event
+async def on_user_update(before, after):
+    if before.name != after.name or before.global_name != after.global_name:
+        names.invalidate_user(after.id)
+        responses.invalidate_user(after.id)
 
-            cur = await db.execute("SELECT user_id, check_in FROM active_sessions")
-            db_sessions = {row[0]: row[1] for row in await cur.fetchall()}
 
-            for uid in list(db_sessions.keys()):
-                if uid not in current_members:
-                    check_out = datetime.now(KST)
-                    await save_session(db, uid, db_sessions[uid], check_out)
-                    await db.execute("DELETE FROM active_sessions WHERE user_id=?", (uid,))
-                    print(f"오프라인 중 퇴장 처리: {uid}")
+@bot.event
+async def on_member_join(member):
+    names.invalidate(member.guild.id, member.id)
+    responses.invalidate(member.guild.id, member.id)
 
-            for uid in current_members:
-                if uid not in db_sessions:
-                    now = datetime.now(KST)
-                    await db.execute(
-                        "INSERT INTO active_sessions (user_id, check_in) VALUES (?,?)",
-                        (uid, now.isoformat())
-                    )
-                    print(f"신규 세션 시작: {uid}")
 
-            await db.commit()
+@bot.event
+async def on_member_remove(member):
+    names.invalidate(member.guild.id, member.id)
+    responses.invalidate(member.guild.id, member.id)  # 나간 사람은 !현황 에서 빠진다
 
 
 @bot.event
+@metrics.timed("event:voice_state_update")
 async def on_voice_state_update(member, before, after):
     if member.bot:
         return
 
-    text_channel = member.guild.get_channel(config.TEXT_CHANNEL_ID)
-    if not text_channel:
+    settings = settings_for(member.guild)
+    if not settings:
         return
+    guild_id = member.guild.id
+    text_channel = member.guild.get_channel(settings.text_channel_id) if settings.text_channel_id else None
 
-    target_id = config.VOICE_CHANNEL_ID
-    is_join = (
-        (not before.channel or before.channel.id != target_id)
-        and (after.channel and after.channel.id == target_id)
-    )
-    is_leave = (
-        (before.channel and before.channel.id == target_id)
-        and (not after.channel or after.channel.id != target_id)
-    )
+    # 추적 채널끼리 옮겨 다니는 건 입·퇴장이 아니다
+    is_join = not settings.tracks(before.channel) and settings.tracks(after.channel)
+    is_leave = settings.tracks(before.channel) and not settings.tracks(after.channel)
 
     if is_join:
-        async with aiosqlite.connect(config.DATABASE_NAME) as db:
-            cur = await db.execute(
-                "SELECT check_in FROM active_sessions WHERE user_id=?", (str(member.id),)
-            )
-            if await cur.fetchone() is None:
-                now = datetime.now(KST)
-                await db.execute(
-                    "INSERT INTO active_sessions (user_id, check_in) VALUES (?,?)",
-                    (str(member.id), now.isoformat())
-                )
-                await db.commit()
-
-        msg = get_join_message(member, datetime.now(KST).hour)
-        await text_channel.send(msg)
-
-        voice_channel = member.guild.get_channel(target_id)
-        if voice_channel:
-            count = len([m for m in voice_channel.members if not m.bot])
-            if count in config.HEADCOUNT_MESSAGES:
-                await text_channel.send(config.HEADCOUNT_MESSAGES[count])
+        # 유예 중인 퇴장이 있으면 잠깐 끊긴 것 — 세션을 그대로 잇고 멘트도 보내지 않는다
+        if leaves.rejoin((guild_id, member.id)):
+            journal.active.stay(guild_id, member.id)
+            return
+        open_session(guild_id, member.id, datetime.now(KST))
+        if not text_channel:
+            return
+
+        # 입장 멘트/인원수 이벤트는 발신 큐에서 짧은 창 단위로 합쳐서 보낸다
+        outbox.announce(text_channel, get_join_message(member, datetime.now(KST).hour))
+
+        count = journal.active.count(guild_id)
+        if count in config.HEADCOUNT_MESSAGES:
+            outbox.milestone(text_channel, config.HEADCOUNT_MESSAGES[count])
 
     elif is_leave:
-        async with aiosqlite.connect(config.DATABASE_NAME) as db:
-            cur = await db.execute(
-                "SELECT check_in FROM active_sessions WHERE user_id=?", (str(member.id),)
-            )
-            row = await cur.fetchone()
-            if row:
-                check_out = datetime.now(KST)
-                split_sessions = await save_session(db, str(member.id), row[0], check_out)
-                await db.execute(
-                    "DELETE FROM active_sessions WHERE user_id=?", (str(member.id),)
-                )
-                await db.commit()
-
-        # ★ 커밋 후 새 커넥션으로 읽기 ★
-        async with aiosqlite.connect(config.DATABASE_NAME) as db2:
-            today_str = check_out.date().isoformat()
-            today_total = await get_duration_sum(db2, str(member.id), today_str)
-            week_dates = get_week_dates(check_out.date())
-            week_total = await get_week_duration(db2, str(member.id), week_dates)
-
-            involved_dates = sorted(set(
-                datetime.fromisoformat(s["check_in"]).date() for s in split_sessions
-            ))
-
-            emoji, label = config.get_weekly_tier(week_total)
-            leave_msg = get_leave_message(member, check_out.hour)
-            msg_lines = [leave_msg]
-
-            if len(involved_dates) > 1:
-                for d in involved_dates:
-                    day_total = await get_duration_sum(db2, str(member.id), d.isoformat())
-                    msg_lines.append(f"> {d.month}/{d.day}: {fmt_time(day_total)}")
-            else:
-                msg_lines.append(f"> 오늘: {fmt_time(today_total)}")
-
-            msg_lines.append(f"> 이번 주 누적: {fmt_time(week_total)} {emoji} {label}")
-            await text_channel.send("\n".join(msg_lines))
+        # 퇴장은 LEAVE_GRACE_SECONDS 동안 들고 있다가 처리 (그 사이 돌아오면 취소)
+        check_out = datetime.now(KST)
+        journal.active.leaving(guild_id, member.id, check_out.timestamp())
+        leaves.hold((guild_id, member.id), lambda: finish_leave(member, settings, check_out))
+
+
+def finish_leave(member, settings, check_out):
+    guild_id = member.guild.id
+    text_channel = member.guild.get_channel(settings.text_channel_id) if settings.text_channel_id else None
+    pieces = close_session(guild_id, member.id, check_out)
+    if pieces:
+        responses.invalidate(guild_id, member.id)
+    if not pieces or not text_channel:
+        return
+
+    # ★ 누적 시간은 close_session이 갱신한 캐시에서 바로 읽기 ★
+    today_total = get_duration_sum(guild_id, member.id, check_out.date())
+    week_dates = get_week_dates(check_out.date())
+    week_total = get_week_duration(guild_id, member.id, week_dates)
+
+    involved_dates = [from_epoch_day(day) for _, _, day in pieces]
+
+    emoji, label = settings.get_tier(week_total)
+    leave_msg = get_leave_message(member, check_out.hour)
+    msg_lines = [leave_msg]
+
+    if len(involved_dates) > 1:
+        for d in involved_dates:
+            day_total = get_duration_sum(guild_id, member.id, d)
+            msg_lines.append(f"> {d.month}/{d.day}: {fmt_time(day_total)}")
+    else:
+        msg_lines.append(f"> 오늘: {fmt_time(today_total)}")
+
+    msg_lines.append(f"> 이번 주 누적: {fmt_time(week_total)} {emoji} {label}")
+    outbox.send(text_channel, "\n".join(msg_lines))
 
 
 # ──────────────────────────────────────────
 # 명령어
 # ──────────────────────────────────────────
 @bot.command(name="현황")
+@commands.guild_only()
 async def weekly_status(ctx):
+    if not settings_for(ctx.guild):
+        await ctx.send("이 서버는 아직 설정이 없어요. `!설정` 을 확인해 주세요.")
+        return
+    if responses.cooldown(ctx.guild.id, "현황", ctx.author.id):
+        return
     now = datetime.now(KST)
     week_dates = get_week_dates(now.date())
-    embed = await build_weekly_embed(ctx.guild, week_dates)
-    await ctx.send(embed=embed)
+    # 닫힌 세션만 세므로 퇴장 전까지는 같은 결과 — 동시에 여러 명이 쳐도 한 번만 만든다
+    key = (ctx.guild.id, "현황", None, to_epoch_day(week_dates[0]))
+    for embed in await responses.get(key, lambda: build_weekly_embeds(ctx.guild, week_dates)):
+        await ctx.send(embed=embed)
 
 
 @bot.command(name="내기록")
+@commands.guild_only()
 async def my_record(ctx):
+    if responses.cooldown(ctx.guild.id, "내기록", ctx.author.id):
+        return
     now = datetime.now(KST)
     week_dates = get_week_dates(now.date())
-    async with aiosqlite.connect(config.DATABASE_NAME) as db:
-        week_total = await get_week_duration(db, str(ctx.author.id), week_dates)
-        month_total = await get_month_duration(db, str(ctx.author.id), now.year, now.month)
-    emoji, label = config.get_weekly_tier(week_total)
-    await ctx.send(
-        f"📊 **{ctx.author.display_name}** 님의 기록\n"
+    if (ctx.guild.id, ctx.author.id) in journal.active:
+        # 진행 중인 시간은 계속 늘어나므로 캐시하지 않는다
+        await ctx.send(await build_record_text(ctx.guild, ctx.author, now, week_dates))
+        return
+    key = (ctx.guild.id, "내기록", ctx.author.id, to_epoch_day(week_dates[0]))
+    await ctx.send(await responses.get(key, lambda: build_record_text(ctx.guild, ctx.author, now, week_dates)))
+
+
+async def build_record_text(guild, member, now, week_dates):
+    settings = settings_for(guild)
+    # 지금 작업방에 있으면 진행 중인 시간까지 포함
+    week_total = get_week_duration(guild.id, member.id, week_dates) \
+        + get_open_duration(guild.id, member.id, week_dates[0], week_dates[-1], now)
+    month_total = get_month_duration(guild.id, member.id, now.year, now.month) \
+        + get_open_duration(guild.id, member.id, now.date().replace(day=1), now.date(), now)
+    emoji, label = settings.get_tier(week_total) if settings else tier_index(config.WEEKLY_TIERS).lookup(week_total)
+    return (
+        f"📊 **{member.display_name}** 님의 기록\n"
         f"> 이번 주: {fmt_time(week_total)} {emoji} {label}\n"
         f"> 이번 달: {fmt_time(month_total)}"
     )
 
 
+async def load_user_stats(guild_id, user_id, now):
+    # 합계 테이블만 읽는다 — 열려 있는 세션의 오늘 몫은 메모리에서 더한다
+    await journal.flush()
+    async with database.read() as db:
+        days = await rollups.fetch_user_days(db, guild_id, user_id)
+        hours = await rollups.fetch_user_hours(db, guild_id, user_id)
+    today = to_epoch_day(now.date())
+    live = get_open_duration(guild_id, user_id, now.date(), now.date(), now)
+    if live:
+        days[today] = days.get(today, 0) + live
+    return days, hours
+
+
+@bot.command(name="통계")
+@commands.guild_only()
+async def long_stats(ctx, member: discord.Member = None):
+    member = member or ctx.author
+    now = datetime.now(KST)
+    days, hours = await load_user_stats(ctx.guild.id, member.id, now)
+    if not days:
+        await ctx.send(f"**{member.display_name}** 님은 아직 기록이 없어요 😅")
+        return
+
+    total = sum(days.values())
+    lines = [
+        f"📈 **{member.display_name}** 님의 누적 통계",
+        f"> 전체: {fmt_time(total)} ({len(days)}일 출석, 하루 평균 {fmt_time(total / len(days))})",
+        f"> {now.year}년: {fmt_time(rollups.year_total(days, now.year))}",
+    ]
+    best = rollups.best_week(days)
+    if best:
+        monday, seconds = best
+        lines.append(f"> 최고의 주: {monday.month}/{monday.day} 주 ({fmt_time(seconds)})")
+    if any(hours):
+        peak = max(range(24), key=hours.__getitem__)
+        lines.append(f"> 가장 많이 달린 시간대: {peak}시")
+        lines.append(f"```\n0     6     12    18    \n{rollups.heatmap(hours)}\n```")
+    await ctx.send("\n".join(lines))
+
+
+@bot.command(name="스트릭")
+@commands.guild_only()
+async def streak(ctx, member: discord.Member = None):
+    member = member or ctx.author
+    now = datetime.now(KST)
+    days, _ = await load_user_stats(ctx.guild.id, member.id, now)
+    current, longest = rollups.streaks(days, now.date())
+    if current:
+        await ctx.send(f"🔥 **{member.display_name}** 님 {current}일 연속 출석 중! (최장 {longest}일)")
+    else:
+        await ctx.send(f"🌱 **{member.display_name}** 님, 오늘부터 다시 시작해 봐요 (최장 {longest}일)")
+
+
+@bot.command(name="지금")
+@commands.guild_only()
+async def now_present(ctx):
+    # 메모리의 재실 인덱스만 본다 — DB 조회 없음
+    present = journal.active.in_guild(ctx.guild.id)
+    if not present:
+        await ctx.send("지금 작업방에 아무도 없어요 🌙")
+        return
+    now = datetime.now(KST)
+    lines = [f"🎧 지금 **{len(present)}명** 작업 중"]
+    for uid, check_in in present.items():
+        name = names.resolve(ctx.guild, uid) or f"<@{uid}>"
+        since = datetime.fromtimestamp(check_in, KST)
+        lines.append(f"> {name}   {fmt_time(now.timestamp() - check_in)} ({since.strftime('%H:%M')}부터)")
+    for chunk in split_message(lines):
+        await ctx.send(chunk)
+
+
 @bot.command(name="진단")
 async def diagnose(ctx):
-    await ctx.send("✅ 봇 정상 작동 중!")
+    async with journal.flushed(), database.read() as db:
+        mismatches = await aggregates.check_consistency(db)
+    if mismatches:
+        lines = [f"⚠️ 누적 캐시 불일치 {len(mismatches)}건을 DB 기준으로 복구했어요."]
+    else:
+        lines = ["✅ 봇 정상 작동 중!"]
+    lines.extend(metrics.render_text())
+    for chunk in split_message(lines):
+        await ctx.send(chunk)
+
+
+@bot.command(name="내보내기")
+@commands.guild_only()
+@commands.has_permissions(manage_guild=True)
+async def export_history(ctx, fmt: str = "csv"):
+    if fmt not in ("csv", "jsonl"):
+        await ctx.send("형식은 `csv` 또는 `jsonl` 이에요. 예: `!내보내기 jsonl`")
+        return
+    await journal.flush()
+    os.makedirs(config.EXPORT_DIR, exist_ok=True)
+    path = os.path.join(config.EXPORT_DIR, f"attendance-{ctx.guild.id}-{datetime.now(KST):%Y%m%d-%H%M%S}.{fmt}.gz")
+    # 읽기 커넥션에서 chunk 단위로 — 내보내는 동안에도 출석 기록은 계속 쓰인다
+    async with database.read() as db:
+        count = await backup.export_attendance(db, path, ctx.guild.id)
+    if os.path.getsize(path) <= config.EXPORT_UPLOAD_LIMIT:
+        await ctx.send(f"📦 {count}행을 내보냈어요.", file=discord.File(path))
+        os.remove(path)  # 올렸으면 서버에 남길 필요 없음 (send 가 파일을 닫는다)
+    else:
+        await ctx.send(f"📦 {count}행을 내보냈어요. 파일이 커서 서버에만 저장했어요: `{path}`")
+
+
+@bot.command(name="가져오기")
+@commands.guild_only()
+@commands.has_permissions(manage_guild=True)
+async def import_history(ctx):
+    # 첨부한 *.csv.gz / *.jsonl.gz 를 이 길드의 기록으로 — 이미 있는 세션은 건너뛴다
+    attachment = ctx.message.attachments[0] if ctx.message.attachments else None
+    if not attachment or not attachment.filename.endswith((".csv.gz", ".jsonl.gz")):
+        await ctx.send("`!내보내기` 로 만든 .csv.gz 또는 .jsonl.gz 파일을 첨부해 주세요.")
+        return
+    os.makedirs(config.EXPORT_DIR, exist_ok=True)
+    path = os.path.join(config.EXPORT_DIR, f"import-{ctx.guild.id}-{attachment.id}-{attachment.filename}")
+    await attachment.save(path)
+    try:
+        backup.validate_file(path, ctx.guild.id)
+        result = await backup.import_attendance(database, backup.read_rows(path, ctx.guild.id))
+    except ValueError as e:
+        await ctx.send(f"⚠️ 가져오지 못했어요 — 기록은 그대로예요. {e}")
+        return
+    except Exception:
+        traceback.print_exc()
+        await ctx.send("⚠️ 가져오는 중 오류가 났어요. 일부만 들어갔을 수 있으니 같은 파일로 다시 시도해 주세요.")
+        return
+    finally:
+        os.remove(path)
+        # 누적 캐시를 DB 기준으로 다시 — 아직 저널에만 있는 퇴장 기록이 빠지지 않게 먼저 반영
+        async with journal.flushed(), database.read() as db:
+            await aggregates.warm(db)
+        responses.invalidate(ctx.guild.id)
+    if result["inserted"] is None:
+        await ctx.send(f"📥 {result['read']}행을 가져왔어요 (이미 있던 세션은 건너뜀).")
+    else:
+        await ctx.send(f"📥 {result['read']}행 중 {result['inserted']}행을 새로 추가했어요.")
+
+
+@bot.group(name="설정", invoke_without_command=True)
+@commands.guild_only()
+@commands.has_permissions(manage_guild=True)
+async def guild_settings(ctx):
+    settings = settings_for(ctx.guild)
+    if not settings:
+        await ctx.send("설정이 없어요. `!설정 음성 <채널...>` 과 `!설정 알림 <채널>` 로 등록해 주세요.")
+        return
+    voice = " ".join(f"<#{cid}>" for cid in sorted(settings.voice_channel_ids)) or "없음"
+    text = f"<#{settings.text_channel_id}>" if settings.text_channel_id else "없음"
+    await ctx.send(f"⚙️ **서버 설정**\n> 추적 음성 채널: {voice}\n> 알림 채널: {text}")
+
+
+# invoke_without_command 그룹은 하위 명령어가 있으면 그룹의 체크를 건너뛰므로 하위 명령어마다 다시 건다
+@guild_settings.command(name="음성")
+@commands.guild_only()
+@commands.has_permissions(manage_guild=True)
+async def set_voice_channels(ctx, *channels: discord.VoiceChannel):
+    if not channels:
+        await ctx.send("추적할 음성 채널을 하나 이상 적어 주세요.")
+        return
+    current = settings_for(ctx.guild)
+    await guild_registry.save(database, GuildSettings(
+        ctx.guild.id, [c.id for c in channels],
+        current.text_channel_id if current else None,
+        current.tiers if current else None,
+    ))
+    # 빠진 채널에 있던 사람은 퇴장 이벤트가 오지 않으므로 지금 닫고, 새 채널에 있던 사람은 지금 연다
+    await reconcile_sessions()
+    responses.invalidate(ctx.guild.id)
+    await ctx.send(f"✅ 추적 음성 채널: {' '.join(c.mention for c in channels)}")
+
+
+@guild_settings.command(name="알림")
+@commands.guild_only()
+@commands.has_permissions(manage_guild=True)
+async def set_text_channel(ctx, channel: discord.TextChannel):
+    current = settings_for(ctx.guild)
+    await guild_registry.save(database, GuildSettings(
+        ctx.guild.id, current.voice_channel_ids if current else [],
+        channel.id, current.tiers if current else None,
+    ))
+    await ctx.send(f"✅ 알림 채널: {channel.mention}")
 
 
 # ──────────────────────────────────────────
 # 스케줄러
 # ──────────────────────────────────────────
-@tasks.loop(minutes=1)
-async def main_scheduler():
-    await bot.wait_until_ready()
-    now = datetime.now(KST)
-    today_str = now.date().isoformat()
-    guild = bot.guilds[0] if bot.guilds else None
-    if not guild:
-        return
+async def for_each_guild(job_name, due, func):
+    # 설정된 길드마다 결산을 동시에(최대 REPORT_CONCURRENCY개) — 길드별로 한 번만 실행되게 기록
+    semaphore = asyncio.Semaphore(config.REPORT_CONCURRENCY)
+
+    async def run(guild, settings):
+        async with semaphore:
+            # 같은 길드를 여러 프로세스가 보고 있어도 리스를 잡은 쪽만 결산
+            lease, marker = f"report:{guild.id}", f"{job_name}:{guild.id}"
+            if not await leases.acquire(lease, config.LEASE_TTL):
+                # 다른 쪽이 아직 끝내지 못했으면 실패로 돌려 재시도 때 다시 확인한다
+                if not await scheduler.has_run(marker, due):
+                    raise RuntimeError(f"{lease}: 다른 프로세스가 리스를 잡고 있음")
+                return
+            try:
+                await scheduler.run_once(marker, due, lambda: func(guild, settings, due))
+            finally:
+                await leases.release(lease)
+
+    results = await asyncio.gather(*(run(g, s) for g, s in configured_guilds()), return_exceptions=True)
+    errors = [r for r in results if isinstance(r, Exception)]
+    for error in errors:
+        traceback.print_exception(error)
+    if errors:
+        # 실패한 길드만 다음 재시도 때 다시 돈다 (성공한 길드는 이미 기록됨)
+        raise RuntimeError(f"{job_name}: {len(errors)}개 길드 실패")
+
+
+async def weekly_report_for_guild(guild, settings, due):
+    week_dates = get_week_dates(due.date() - timedelta(days=7))
+    embeds = await build_weekly_embeds(guild, week_dates)
+    text_channel = guild.get_channel(settings.text_channel_id) if settings.text_channel_id else None
+    if text_channel:
+        for embed in embeds:
+            await text_channel.send(embed=embed)
 
-    text_channel = guild.get_channel(config.TEXT_CHANNEL_ID)
 
-    if now.weekday() == 0 and now.hour == 9 and now.minute == 0 and last_task_run["weekly"] != today_str:
-        last_task_run["weekly"] = today_str
-        last_monday = now.date() - timedelta(days=7)
-        week_dates = get_week_dates(last_monday)
-        embed = await build_weekly_embed(guild, week_dates)
-        if text_channel:
-            await text_channel.send(embed=embed)
+async def monthly_report_for_guild(guild, settings, due):
+    last_month = due.date().replace(day=1) - timedelta(days=1)
+    report_text = await build_monthly_report(guild, last_month.year, last_month.month)
+    text_channel = guild.get_channel(settings.text_channel_id) if settings.text_channel_id else None
+    if text_channel:
+        # 인원이 많으면 2000자 제한을 넘으므로 줄 단위로 나눠 보낸다
+        for chunk in split_message(report_text.split("\n")):
+            await text_channel.send(chunk)
+
+    result = await rollover.rollover_month(
+        database, guild.id, last_month.year, last_month.month, archive_dir=config.ARCHIVE_DIR
+    )
+    aggregates.trim()
+    responses.invalidate(guild.id)
+    print(f"월간 롤오버({guild.id}): 보관 {result['archived']}행, 정리 {result['pruned']}행")
+
+
+@metrics.timed("job:weekly")
+async def weekly_report_job(due):
+    await for_each_guild("weekly", due, weekly_report_for_guild)
+
+
+@metrics.timed("job:monthly")
+async def monthly_report_job(due):
+    await for_each_guild("monthly", due, monthly_report_for_guild)
+
+
+def instance_job(name):
+    # 작업 단위 기록도 프로세스마다 — 한 프로세스가 끝냈다고 다른 프로세스의 길드까지 건너뛰지 않게
+    return name if INSTANCE_NAME == "main" else f"{name}:{INSTANCE_NAME}"
+
 
-    if now.day == 1 and now.hour == 9 and now.minute == 0 and last_task_run["monthly"] != today_str:
-        last_task_run["monthly"] = today_str
-        last_month = now.date().replace(day=1) - timedelta(days=1)
-        report = await build_monthly_report(guild, last_month.year, last_month.month)
-        if text_channel:
-            await text_channel.send(report)
-
-        async with aiosqlite.connect(config.DATABASE_NAME) as db:
-            start = f"{last_month.year}-{last_month.month:02d}-01"
-            end = f"{last_month.year}-{last_month.month:02d}-{calendar.monthrange(last_month.year, last_month.month)[1]}"
-            await db.execute(
-                "DELETE FROM attendance WHERE check_in_date BETWEEN ? AND ?", (start, end)
-            )
-            await db.commit()
+scheduler = Scheduler(database, [
+    Job(instance_job("weekly"), WeeklyAt(weekday=0, hour=9), weekly_report_job),
+    Job(instance_job("monthly"), MonthlyAt(day=1, hour=9), monthly_report_job),
+])
 
 
 # ──────────────────────────────────────────
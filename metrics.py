@@ -0,0 +1,205 @@
+"""
+가벼운 계측 — 핸들러/명령어/작업별 지연 히스토그램, 쿼리 수, 큐 깊이 같은 게이지
+
+    - timed(name): 비동기 함수 데코레이터 / scope(name): async with 블록
+      둘 다 그 안에서 실행된 DB 쿼리 수를 같은 이름으로 센다 (contextvar)
+    - render_text(): !진단 용 요약, render_prometheus(): 텍스트 노출 형식
+    - serve(): 로컬 HTTP 엔드포인트 (/metrics), start_writer(): 주기적 파일 저장
+"""
+
+import os
+import math
+import time
+import asyncio
+import functools
+import contextvars
+import traceback
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+# 초 단위 버킷 상한 — 마지막은 +Inf
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+# 지금 열려 있는 스코프 이름들 — 안쪽 스코프의 쿼리는 바깥 스코프에도 함께 센다
+_scope = contextvars.ContextVar("metrics_scope", default=())
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        # 버킷 상한으로 어림 (실제 값은 이보다 작거나 같다)
+        if not self.count:
+            return 0.0
+        target, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.histograms = defaultdict(Histogram)   # 이름 -> 지연 (초)
+        self.queries = defaultdict(int)            # 이름 -> 실행한 쿼리 수
+        self.errors = defaultdict(int)             # 이름 -> 예외 수
+        self.gauges = {}                           # 이름 -> 값을 돌려주는 함수
+        self._server = None
+        self._writer = None
+
+    # ── 기록 ──
+    def count_query(self):
+        # Database.on_query 에 연결 — 열린 스코프마다(없으면 "other") 하나씩 더한다
+        for name in _scope.get() or ("other",):
+            self.queries[name] += 1
+
+    def observe(self, name, seconds):
+        self.histograms[name].observe(seconds)
+
+    def start(self, name):
+        # 시작과 끝이 다른 콜백에 있을 때 (명령어 before/after 훅) — 같은 task 안에서 짝지어 부른다
+        return _scope.set(_scope.get() + (name,)), name, self.clock()
+
+    def finish(self, handle, failed=False):
+        token, name, start = handle
+        if failed:
+            self.errors[name] += 1
+        self.observe(name, self.clock() - start)
+        _scope.reset(token)
+
+    @asynccontextmanager
+    async def scope(self, name):
+        handle = self.start(name)
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.finish(handle, failed)
+
+    def timed(self, name):
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                async with self.scope(name):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def gauge(self, name, func):
+        self.gauges[name] = func
+
+    def read_gauges(self):
+        values = {}
+        for name, func in self.gauges.items():
+            try:
+                value = float(func())
+            except Exception:
+                continue
+            if math.isfinite(value):
+                values[name] = value
+        return values
+
+    # ── 출력 ──
+    def render_text(self):
+        lines = ["**지연 (p50 / p99 / 최대) · 호출 · 호출당 쿼리**"]
+        for name in sorted(self.histograms):
+            h = self.histograms[name]
+            lines.append(
+                f"> `{name}` {_ms(h.quantile(0.5))} / {_ms(h.quantile(0.99))} / {_ms(h.max)}"
+                f" · {h.count}회 · {self.queries.get(name, 0) / h.count:.1f}"
+            )
+        if self.queries.get("other"):
+            lines.append(f"> 그 밖의 쿼리 {self.queries['other']}회")
+        gauges = self.read_gauges()
+        if gauges:
+            lines.append("**상태**")
+            lines.extend(f"> `{name}` {_fmt(value)}" for name, value in sorted(gauges.items()))
+        return lines
+
+    def render_prometheus(self, prefix="attendance"):
+        out = [f"# TYPE {prefix}_latency_seconds histogram"]
+        for name, h in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, n in zip(h.buckets, h.counts):
+                cumulative += n
+                le = "+Inf" if math.isinf(bound) else repr(bound)
+                out.append(f'{prefix}_latency_seconds_bucket{{name="{name}",le="{le}"}} {cumulative}')
+            out.append(f'{prefix}_latency_seconds_sum{{name="{name}"}} {h.sum}')
+            out.append(f'{prefix}_latency_seconds_count{{name="{name}"}} {h.count}')
+        out.append(f"# TYPE {prefix}_queries_total counter")
+        out.extend(f'{prefix}_queries_total{{name="{n}"}} {v}' for n, v in sorted(self.queries.items()))
+        out.append(f"# TYPE {prefix}_errors_total counter")
+        out.extend(f'{prefix}_errors_total{{name="{n}"}} {v}' for n, v in sorted(self.errors.items()))
+        for name, value in sorted(self.read_gauges().items()):
+            out.append(f"# TYPE {prefix}_{name} gauge")
+            out.append(f"{prefix}_{name} {value}")
+        return "\n".join(out) + "\n"
+
+    # ── 노출 ──
+    async def serve(self, host, port):
+        # aiohttp 는 discord.py 의존성이라 이미 설치되어 있다
+        from aiohttp import web
+
+        async def handle(request):
+            return web.Response(text=self.render_prometheus(), content_type="text/plain")
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        self._server = web.AppRunner(app)
+        await self._server.setup()
+        await web.TCPSite(self._server, host, port).start()
+
+    def write_file(self, path):
+        # 임시 파일에 쓰고 이름을 바꿔서 읽는 쪽이 반쪽짜리 파일을 보지 않게
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+    def start_writer(self, path, interval):
+        async def run():
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    self.write_file(path)
+                except Exception:
+                    traceback.print_exc()
+
+        if self._writer is None:
+            self._writer = asyncio.create_task(run())
+
+    async def stop(self):
+        if self._writer:
+            self._writer.cancel()
+            self._writer = None
+        if self._server:
+            await self._server.cleanup()
+            self._server = None
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:.1f}ms"
+
+
+def _fmt(value):
+    return f"{value:.0f}" if value == int(value) else f"{value:.3f}"
@@ -0,0 +1,359 @@
+"""
+버전별 스키마 마이그레이션 — 시작할 때 PRAGMA user_version 기준으로 순서대로 적용
+"""
+
+import sys
+import asyncio
+from datetime import datetime, date
+import aiosqlite
+from timeutil import KST, to_epoch_day
+import rollups
+
+
+async def _v1_base_schema(db):
+    # 최초 스키마 (이미 테이블이 있는 기존 DB에서는 아무 일도 하지 않음)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS attendance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT,
+            check_in TEXT,
+            check_out TEXT,
+            duration INTEGER,
+            check_in_date TEXT
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS active_sessions (
+            user_id TEXT PRIMARY KEY,
+            check_in TEXT
+        )
+    """)
+
+
+def _iso_to_ts(value):
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=KST)
+    return dt.timestamp()
+
+
+async def _v2_typed_columns(db):
+    # user_id는 INTEGER 스노우플레이크, 시각은 epoch 초, 날짜는 epoch-day 정수
+    await db.execute("""
+        CREATE TABLE attendance_v2 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            check_in REAL NOT NULL,
+            check_out REAL NOT NULL,
+            duration INTEGER NOT NULL,
+            day INTEGER NOT NULL
+        )
+    """)
+    async with db.execute(
+        "SELECT id, user_id, check_in, check_out, duration, check_in_date FROM attendance"
+    ) as cur:
+        rows = [
+            (
+                row_id, int(user_id), _iso_to_ts(check_in), _iso_to_ts(check_out),
+                duration or 0, to_epoch_day(date.fromisoformat(check_in_date))
+            )
+            for row_id, user_id, check_in, check_out, duration, check_in_date in await cur.fetchall()
+        ]
+    await db.executemany(
+        "INSERT INTO attendance_v2 (id, user_id, check_in, check_out, duration, day) VALUES (?,?,?,?,?,?)",
+        rows
+    )
+    await db.execute("DROP TABLE attendance")
+    await db.execute("ALTER TABLE attendance_v2 RENAME TO attendance")
+    await db.execute("CREATE INDEX idx_attendance_day_user ON attendance (day, user_id)")
+
+    await db.execute("""
+        CREATE TABLE active_sessions_v2 (
+            user_id INTEGER PRIMARY KEY,
+            check_in REAL NOT NULL
+        )
+    """)
+    async with db.execute("SELECT user_id, check_in FROM active_sessions") as cur:
+        rows = [(int(user_id), _iso_to_ts(check_in)) for user_id, check_in in await cur.fetchall()]
+    await db.executemany("INSERT INTO active_sessions_v2 (user_id, check_in) VALUES (?,?)", rows)
+    await db.execute("DROP TABLE active_sessions")
+    await db.execute("ALTER TABLE active_sessions_v2 RENAME TO active_sessions")
+
+
+async def _v3_daily_totals(db):
+    # 월간 롤오버가 압축해 두는 (user_id, 날짜)별 합계 — 원본을 지워도 장기 통계는 남는다
+    await db.execute("""
+        CREATE TABLE daily_totals (
+            user_id INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            seconds INTEGER NOT NULL,
+            PRIMARY KEY (user_id, day)
+        ) WITHOUT ROWID
+    """)
+    await db.execute("CREATE INDEX idx_daily_totals_day ON daily_totals (day)")
+
+
+async def _v4_scheduler_runs(db):
+    # 스케줄 작업별 마지막 실행 기록 (재시작해도 중복/누락 없이)
+    await db.execute("""
+        CREATE TABLE scheduler_runs (
+            job TEXT PRIMARY KEY,
+            last_due REAL NOT NULL,
+            ran_at REAL NOT NULL
+        )
+    """)
+
+
+async def _v5_journal_state(db):
+    # write-behind 저널에서 DB까지 반영된 마지막 이벤트 번호
+    await db.execute("""
+        CREATE TABLE journal_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            applied_seq INTEGER NOT NULL
+        )
+    """)
+
+
+async def _v6_guild_scope(db):
+    # 여러 서버를 한 프로세스에서 — 길드별 설정 테이블, 모든 기록에 guild_id
+    # 기존 기록은 guild_id=0 으로 두고, 시작할 때 기존 설정 채널이 있는 길드가 가져간다
+    await db.execute("""
+        CREATE TABLE guild_config (
+            guild_id INTEGER PRIMARY KEY,
+            voice_channel_ids TEXT NOT NULL,
+            text_channel_id INTEGER,
+            tiers TEXT
+        )
+    """)
+
+    await db.execute("ALTER TABLE attendance ADD COLUMN guild_id INTEGER NOT NULL DEFAULT 0")
+    await db.execute("DROP INDEX idx_attendance_day_user")
+    await db.execute("CREATE INDEX idx_attendance_guild_day_user ON attendance (guild_id, day, user_id)")
+
+    await db.execute("""
+        CREATE TABLE active_sessions_v6 (
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            check_in REAL NOT NULL,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    """)
+    await db.execute(
+        "INSERT INTO active_sessions_v6 (guild_id, user_id, check_in) SELECT 0, user_id, check_in FROM active_sessions"
+    )
+    await db.execute("DROP TABLE active_sessions")
+    await db.execute("ALTER TABLE active_sessions_v6 RENAME TO active_sessions")
+
+    await db.execute("""
+        CREATE TABLE daily_totals_v6 (
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            seconds INTEGER NOT NULL,
+            PRIMARY KEY (guild_id, user_id, day)
+        ) WITHOUT ROWID
+    """)
+    await db.execute(
+        "INSERT INTO daily_totals_v6 (guild_id, user_id, day, seconds) SELECT 0, user_id, day, seconds FROM daily_totals"
+    )
+    await db.execute("DROP TABLE daily_totals")
+    await db.execute("ALTER TABLE daily_totals_v6 RENAME TO daily_totals")
+    await db.execute("CREATE INDEX idx_daily_totals_guild_day ON daily_totals (guild_id, day)")
+
+
+async def _v7_multi_process(db):
+    # 여러 프로세스가 같은 저장소를 쓸 때 — 리더 선출용 리스, 프로세스(저널)별 반영 번호
+    await db.execute("""
+        CREATE TABLE leases (
+            name TEXT PRIMARY KEY,
+            holder TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE journal_state_v7 (
+            name TEXT PRIMARY KEY,
+            applied_seq INTEGER NOT NULL
+        )
+    """)
+    await db.execute("INSERT INTO journal_state_v7 (name, applied_seq) SELECT 'main', applied_seq FROM journal_state")
+    await db.execute("DROP TABLE journal_state")
+    await db.execute("ALTER TABLE journal_state_v7 RENAME TO journal_state")
+
+
+async def _v8_rollups(db):
+    # daily_totals 를 롤오버 때만이 아니라 세션을 저장할 때마다 올리고, 시간대별 누적도 둔다
+    await db.execute("""
+        CREATE TABLE hourly_totals (
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            hour INTEGER NOT NULL,
+            seconds REAL NOT NULL,
+            PRIMARY KEY (guild_id, user_id, hour)
+        ) WITHOUT ROWID
+    """)
+    await _backfill_rollups(db)
+
+
+async def _backfill_rollups(db):
+    # 아직 롤오버되지 않은 원본을 합계 테이블에 더한다 (롤오버된 달과 날짜가 겹치지 않음)
+    async with db.execute("SELECT guild_id, user_id, check_in, check_out, duration, day FROM attendance") as cur:
+        rows = await cur.fetchall()
+    await rollups.apply_rollups(db, rows)
+
+
+async def _v9_session_key(db):
+    # (guild_id, user_id, check_in) 은 세션 조각 하나 — 가져오기를 여러 번 해도 같은 행이 두 번 들어가지 않게
+    cur = await db.execute(
+        "DELETE FROM attendance WHERE id NOT IN "
+        "(SELECT MIN(id) FROM attendance GROUP BY guild_id, user_id, check_in)"
+    )
+    removed = cur.rowcount
+    await cur.close()
+    if removed > 0:
+        # 중복이 빠진 날짜의 합계를 원본 기준으로 다시 맞춘다
+        await db.execute("""
+            INSERT INTO daily_totals (guild_id, user_id, day, seconds)
+            SELECT guild_id, user_id, day, SUM(duration) FROM attendance GROUP BY guild_id, user_id, day
+            ON CONFLICT (guild_id, user_id, day) DO UPDATE SET seconds = excluded.seconds
+        """)
+    await db.execute("CREATE UNIQUE INDEX uq_attendance_session ON attendance (guild_id, user_id, check_in)")
+
+
+MIGRATIONS = [
+    (1, _v1_base_schema),
+    (2, _v2_typed_columns),
+    (3, _v3_daily_totals),
+    (4, _v4_scheduler_runs),
+    (5, _v5_journal_state),
+    (6, _v6_guild_scope),
+    (7, _v7_multi_process),
+    (8, _v8_rollups),
+    (9, _v9_session_key),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+# ──────────────────────────────────────────
+# PostgreSQL — 새로 만드는 서버 DB라 단계별 이력 없이 최신 스키마를 바로 만든다
+# ──────────────────────────────────────────
+POSTGRES_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS attendance (
+        id BIGSERIAL PRIMARY KEY,
+        guild_id BIGINT NOT NULL DEFAULT 0,
+        user_id BIGINT NOT NULL,
+        check_in DOUBLE PRECISION NOT NULL,
+        check_out DOUBLE PRECISION NOT NULL,
+        duration DOUBLE PRECISION NOT NULL,
+        day INTEGER NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_attendance_guild_day_user ON attendance (guild_id, day, user_id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_attendance_session ON attendance (guild_id, user_id, check_in)",
+    """CREATE TABLE IF NOT EXISTS active_sessions (
+        guild_id BIGINT NOT NULL,
+        user_id BIGINT NOT NULL,
+        check_in DOUBLE PRECISION NOT NULL,
+        PRIMARY KEY (guild_id, user_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS daily_totals (
+        guild_id BIGINT NOT NULL,
+        user_id BIGINT NOT NULL,
+        day INTEGER NOT NULL,
+        seconds DOUBLE PRECISION NOT NULL,
+        PRIMARY KEY (guild_id, user_id, day)
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_daily_totals_guild_day ON daily_totals (guild_id, day)",
+    """CREATE TABLE IF NOT EXISTS scheduler_runs (
+        job TEXT PRIMARY KEY,
+        last_due DOUBLE PRECISION NOT NULL,
+        ran_at DOUBLE PRECISION NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS journal_state (
+        name TEXT PRIMARY KEY,
+        applied_seq BIGINT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS guild_config (
+        guild_id BIGINT PRIMARY KEY,
+        voice_channel_ids TEXT NOT NULL,
+        text_channel_id BIGINT,
+        tiers TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS leases (
+        name TEXT PRIMARY KEY,
+        holder TEXT NOT NULL,
+        expires_at DOUBLE PRECISION NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS hourly_totals (
+        guild_id BIGINT NOT NULL,
+        user_id BIGINT NOT NULL,
+        hour INTEGER NOT NULL,
+        seconds DOUBLE PRECISION NOT NULL,
+        PRIMARY KEY (guild_id, user_id, hour)
+    )""",
+    "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)",
+]
+
+
+async def _migrate_postgres(db):
+    async with db.execute("SELECT to_regclass('schema_version')") as cur:
+        exists = (await cur.fetchone())[0] is not None
+    current = 0
+    if exists:
+        async with db.execute("SELECT MAX(version) FROM schema_version") as cur:
+            current = (await cur.fetchone())[0] or 0
+    if current >= SCHEMA_VERSION:
+        return []
+    for stmt in POSTGRES_SCHEMA:
+        await db.execute(stmt)
+    if 0 < current < 8:
+        await _backfill_rollups(db)
+    await db.execute("DELETE FROM schema_version")
+    await db.execute("INSERT INTO schema_version (version) VALUES (?)", (SCHEMA_VERSION,))
+    return [SCHEMA_VERSION]
+
+
+async def get_version(db):
+    async with db.execute("PRAGMA user_version") as cur:
+        return (await cur.fetchone())[0]
+
+
+async def migrate(db, dialect="sqlite"):
+    if dialect == "postgres":
+        return await _migrate_postgres(db)
+
+    # 각 단계는 자체 트랜잭션 — 실패하면 그 단계만 롤백되고 버전도 그대로 남는다
+    current = await get_version(db)
+    applied = []
+    for version, step in MIGRATIONS:
+        if version <= current:
+            continue
+        await db.commit()
+        await db.execute("BEGIN")
+        try:
+            await step(db)
+            await db.execute(f"PRAGMA user_version={version}")
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+        applied.append(version)
+    return applied
+
+
+# ──────────────────────────────────────────
+# 단독 실행: python migrations.py data/attendance.db
+# ──────────────────────────────────────────
+async def _migrate_file(path):
+    async with aiosqlite.connect(path) as db:
+        before = await get_version(db)
+        await migrate(db)
+        return before, await get_version(db)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("사용법: python migrations.py <DB 파일>")
+        sys.exit(1)
+    before, after = asyncio.run(_migrate_file(sys.argv[1]))
+    print(f"스키마 버전 v{before} → v{after}")
@@ -0,0 +1,166 @@
+"""
+비동기 발신 큐 — 이벤트 핸들러는 메시지를 넣기만 하고 바로 돌아간다
+
+    - 채널별 토큰 버킷으로 디스코드 rate limit 아래에서 발신
+    - 짧은 시간 안의 입장 멘트/인원수 이벤트는 한 메시지로 합침
+    - 채널별 큐 길이 제한, 넘치면 버리고 dropped 카운트
+
+채널은 .id 와 async send(content=..., embed=...) 만 있으면 되므로 가짜 객체로 시험할 수 있다.
+"""
+
+import asyncio
+import time
+import traceback
+
+MESSAGE_LIMIT = 2000
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self):
+        # 토큰 하나를 쓸 수 있을 때까지 남은 초 (0이면 바로 가능)
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+
+class Outbox:
+    def __init__(self, maxsize=50, rate=1.0, burst=5, coalesce_window=3.0,
+                 clock=time.monotonic, sleep=asyncio.sleep):
+        self.maxsize = maxsize
+        self.rate = rate
+        self.burst = burst
+        self.coalesce_window = coalesce_window
+        self.clock = clock
+        self.sleep = sleep
+        self._queues = {}    # channel_id -> asyncio.Queue
+        self._workers = {}   # channel_id -> Task
+        self._buckets = {}   # channel_id -> TokenBucket
+        self._pending = {}   # channel_id -> {"channel", "lines", "milestone"}
+        self._flushers = set()
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self.coalesced = 0
+
+    # ── 넣기 ──
+    def send(self, channel, content=None, embed=None):
+        # 합치는 중인 멘트가 있으면 먼저 내보내서 순서를 지킨다
+        if channel.id in self._pending:
+            self.flush(channel.id)
+        queue = self._queues.get(channel.id)
+        if queue is None:
+            queue = self._queues[channel.id] = asyncio.Queue(self.maxsize)
+            self._buckets[channel.id] = TokenBucket(self.rate, self.burst, self.clock)
+        try:
+            queue.put_nowait((channel, content, embed))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        worker = self._workers.get(channel.id)
+        if worker is None or worker.done():
+            self._workers[channel.id] = asyncio.create_task(self._worker(channel.id))
+        return True
+
+    def _pending_for(self, channel):
+        pending = self._pending.get(channel.id)
+        if pending is None:
+            pending = self._pending[channel.id] = {"channel": channel, "lines": [], "milestone": None}
+            task = asyncio.create_task(self._flush_later(channel.id))
+            self._flushers.add(task)
+            task.add_done_callback(self._flushers.discard)
+        else:
+            self.coalesced += 1
+        return pending
+
+    def announce(self, channel, line):
+        self._pending_for(channel)["lines"].append(line)
+
+    def milestone(self, channel, text):
+        # 창 안에서 여러 인원수 이벤트가 나오면 마지막 것만 남긴다
+        self._pending_for(channel)["milestone"] = text
+
+    async def _flush_later(self, channel_id):
+        await self.sleep(self.coalesce_window)
+        self.flush(channel_id)
+
+    def flush(self, channel_id):
+        pending = self._pending.pop(channel_id, None)
+        if not pending:
+            return
+        lines = pending["lines"] + ([pending["milestone"]] if pending["milestone"] else [])
+        for chunk in split_message(lines):
+            self.send(pending["channel"], chunk)
+
+    # ── 보내기 ──
+    async def _worker(self, channel_id):
+        queue = self._queues[channel_id]
+        bucket = self._buckets[channel_id]
+        while not queue.empty():
+            channel, content, embed = queue.get_nowait()
+            while (wait := bucket.delay()) > 0:
+                await self.sleep(wait)
+            bucket.take()
+            try:
+                await channel.send(content=content, embed=embed)
+                self.sent += 1
+            except Exception:
+                self.failed += 1
+                traceback.print_exc()
+            finally:
+                queue.task_done()
+
+    async def drain(self):
+        for channel_id in list(self._pending):
+            self.flush(channel_id)
+        for queue in list(self._queues.values()):
+            await queue.join()
+
+    async def stop(self, timeout=5.0):
+        for task in list(self._flushers):
+            task.cancel()
+        try:
+            await asyncio.wait_for(self.drain(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        for task in self._workers.values():
+            task.cancel()
+
+    def depth(self):
+        return sum(q.qsize() for q in self._queues.values())
+
+    def stats(self):
+        return {
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+            "depth": self.depth(),
+        }
+
+
+def split_message(lines, limit=MESSAGE_LIMIT):
+    chunks, current = [], ""
+    for line in lines:
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit and current:
+            chunks.append(current)
+            candidate = line
+        current = candidate[:limit]
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,91 @@
+"""
+실시간 재실 인덱스 — 지금 열린 세션을 (guild_id, user_id)와 길드별로 함께 들고 있어
+인원수와 진행 중인 시간을 DB 없이 바로 계산한다 (active_sessions 로 채우고 음성 이벤트로 갱신)
+
+퇴장 유예 중인 세션은 열린 채로 두되(다시 들어오면 이어 붙이므로) 인원수·목록에서는 빼고,
+진행 중인 시간은 퇴장 시각까지만 센다.
+"""
+
+from collections import defaultdict
+from timeutil import split_interval
+
+
+class PresenceIndex:
+    def __init__(self):
+        self._sessions = {}                 # (guild_id, user_id) -> check_in 타임스탬프
+        self._by_guild = defaultdict(dict)  # guild_id -> {user_id: check_in}
+        self._leaving = {}                  # (guild_id, user_id) -> 유예 중인 퇴장 시각
+        self._leaving_count = defaultdict(int)
+
+    def load(self, rows):
+        # rows: [(guild_id, user_id, check_in)]
+        self._sessions.clear()
+        self._by_guild.clear()
+        self._leaving.clear()
+        self._leaving_count.clear()
+        for guild_id, user_id, check_in in rows:
+            self.add(guild_id, user_id, check_in)
+
+    def add(self, guild_id, user_id, check_in):
+        if (guild_id, user_id) in self._sessions:
+            return False
+        self._sessions[(guild_id, user_id)] = check_in
+        self._by_guild[guild_id][user_id] = check_in
+        return True
+
+    def remove(self, guild_id, user_id):
+        self.stay(guild_id, user_id)
+        check_in = self._sessions.pop((guild_id, user_id), None)
+        if check_in is not None:
+            members = self._by_guild[guild_id]
+            del members[user_id]
+            if not members:
+                del self._by_guild[guild_id]
+        return check_in
+
+    def leaving(self, guild_id, user_id, ts):
+        # 퇴장 유예 시작 — 세션은 열어 둔다
+        key = (guild_id, user_id)
+        if key in self._sessions and key not in self._leaving:
+            self._leaving_count[guild_id] += 1
+        if key in self._sessions:
+            self._leaving[key] = ts
+
+    def stay(self, guild_id, user_id):
+        # 유예 중에 다시 들어옴 (또는 세션이 닫힘)
+        if self._leaving.pop((guild_id, user_id), None) is not None:
+            self._leaving_count[guild_id] -= 1
+            if not self._leaving_count[guild_id]:
+                del self._leaving_count[guild_id]
+
+    def get(self, key):
+        return self._sessions.get(key)
+
+    def __contains__(self, key):
+        return key in self._sessions
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def items(self):
+        return self._sessions.items()
+
+    def count(self, guild_id):
+        by_guild = self._by_guild.get(guild_id)
+        return len(by_guild) - self._leaving_count.get(guild_id, 0) if by_guild else 0
+
+    def in_guild(self, guild_id):
+        # {user_id: check_in} — 먼저 들어온 순서, 퇴장 유예 중인 사람은 뺀다
+        members = self._by_guild.get(guild_id, {})
+        return dict(sorted(
+            ((uid, ts) for uid, ts in members.items() if (guild_id, uid) not in self._leaving),
+            key=lambda x: x[1]
+        ))
+
+    def open_seconds(self, guild_id, user_id, start_day, end_day, now_ts):
+        # 진행 중인 세션 중 [start_day, end_day] 에 속하는 초 — 닫힌 기록(캐시)에 더해서 쓴다
+        check_in = self._sessions.get((guild_id, user_id))
+        if check_in is None:
+            return 0
+        end_ts = min(now_ts, self._leaving.get((guild_id, user_id), now_ts))
+        return sum(e - s for s, e, day in split_interval(check_in, end_ts) if start_day <= day <= end_day)
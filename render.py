@@ -0,0 +1,110 @@
+"""
+결산 렌더링 — 단계표 인덱스, 표시 이름 캐시, 디스코드 제한에 맞춘 임베드 분할
+"""
+
+from bisect import bisect_right
+from functools import lru_cache
+import discord
+from outbox import split_message
+
+FIELD_LIMIT = 1024        # 필드 값 최대 길이
+FIELDS_PER_EMBED = 25     # 임베드 하나의 최대 필드 수
+EMBED_LIMIT = 6000        # 임베드 하나의 제목+설명+필드+푸터 합계 최대 길이
+
+NO_TIER = ("⬜", "이번 주 쉬었나요")
+
+
+# ──────────────────────────────────────────
+# 주간 단계표
+# ──────────────────────────────────────────
+class TierIndex:
+    # (최소, 최대, 이모지, 이름) 표를 최소값 순으로 정렬해 두고 이분 탐색
+    def __init__(self, table):
+        self.order = [(emoji, label) for _, _, emoji, label in table]  # 표시 순서는 원래 표 그대로
+        self._tiers = sorted(table, key=lambda t: t[0])
+        self._mins = [t[0] for t in self._tiers]
+
+    def lookup(self, total_seconds):
+        i = bisect_right(self._mins, total_seconds) - 1
+        if i >= 0:
+            _, max_s, emoji, label = self._tiers[i]
+            if max_s is None or total_seconds < max_s:
+                return emoji, label
+        return NO_TIER
+
+
+@lru_cache(maxsize=32)
+def _tier_index(key):
+    return TierIndex(key)
+
+
+def tier_index(table):
+    # 같은 표는 한 번만 인덱싱 (길드 설정의 표는 리스트라 튜플로 바꿔 키로 쓴다)
+    return _tier_index(tuple(tuple(t) for t in table))
+
+
+# ──────────────────────────────────────────
+# 표시 이름
+# ──────────────────────────────────────────
+class NameCache:
+    # (guild_id, user_id) -> 표시 이름 — 봇이거나 서버에 없는 사용자는 None
+    # 멤버 정보가 바뀌는 이벤트에서 invalidate 해 준다
+    def __init__(self):
+        self._names = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, guild, user_id):
+        key = (guild.id, user_id)
+        if key in self._names:
+            self.hits += 1
+        else:
+            self.misses += 1
+            member = guild.get_member(user_id)
+            self._names[key] = member.display_name if member and not member.bot else None
+        return self._names[key]
+
+    def invalidate(self, guild_id, user_id):
+        self._names.pop((guild_id, user_id), None)
+
+    def invalidate_user(self, user_id):
+        # 전역 이름이 바뀌면 모든 길드의 표시 이름이 바뀔 수 있다
+        for key in [k for k in self._names if k[1] == user_id]:
+            del self._names[key]
+
+    def __len__(self):
+        return len(self._names)
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+# ──────────────────────────────────────────
+# 임베드 분할
+# ──────────────────────────────────────────
+def build_embeds(title, description, sections, color, footer=None):
+    # sections: [(필드 이름, [줄...])] — 필드 길이, 필드 수, 임베드 전체 길이를 넘지 않게
+    # 필드와 임베드를 나눈다. 메시지 하나에 임베드 하나씩 보내면 된다.
+    fields = []
+    for name, lines in sections:
+        for i, value in enumerate(split_message(lines, FIELD_LIMIT)):
+            fields.append((name if i == 0 else f"{name} (계속)", value))
+
+    continued = f"{title} (계속)"
+    reserve = len(continued) + len(footer or "")
+
+    embeds = [discord.Embed(title=title, description=description, color=color)]
+    size = reserve + len(description or "")
+    for name, value in fields:
+        field_size = len(name) + len(value)
+        if len(embeds[-1].fields) >= FIELDS_PER_EMBED or size + field_size > EMBED_LIMIT:
+            embeds.append(discord.Embed(title=continued, color=color))
+            size = reserve
+        embeds[-1].add_field(name=name, value=value, inline=False)
+        size += field_size
+
+    if footer:
+        embeds[-1].set_footer(text=footer)
+    return embeds
@@ -0,0 +1,110 @@
+"""
+월간 결산 엔진 — (user_id, 날짜)별 합계를 한 번의 그룹 쿼리로 가져와
+월 합계 / 주차별 단계 / MVP / 개근상 / 순위를 모두 메모리에서 계산한다
+
+오프라인 사용: python report.py data/attendance.db 2025 7 [guild_id]
+"""
+
+import sys
+import asyncio
+import calendar
+from collections import defaultdict, namedtuple
+import aiosqlite
+import config
+from datetime import date
+from timeutil import fmt_time, to_epoch_day
+from render import tier_index
+
+MEDALS = ["🥇", "🥈", "🥉"]
+
+OfflineMember = namedtuple("OfflineMember", "display_name mention")
+
+
+async def fetch_month_daily_totals(db, year, month, guild_id=None):
+    # guild_id가 None이면 모든 길드를 합쳐서 (오프라인 분석용)
+    first = to_epoch_day(date(year, month, 1))
+    last = first + calendar.monthrange(year, month)[1] - 1
+    daily = defaultdict(dict)  # user_id -> {일: 초}
+    guild_filter = "" if guild_id is None else "guild_id = ? AND "
+    params = (first, last) if guild_id is None else (guild_id, first, last)
+    async with db.execute(
+        f"SELECT user_id, day, SUM(duration) FROM attendance "
+        f"WHERE {guild_filter}day BETWEEN ? AND ? GROUP BY user_id, day",
+        params
+    ) as cur:
+        async for user_id, day, total in cur:
+            daily[user_id][day - first + 1] = total or 0
+    return daily
+
+
+def compute_monthly_report(daily, year, month, resolve, tiers=None):
+    # resolve(user_id) -> display_name / mention 을 가진 객체, 제외할 사용자는 None
+    weeks = calendar.monthcalendar(year, month)
+    index = tier_index(tiers or config.WEEKLY_TIERS)
+    rows = []
+    for uid, days in daily.items():
+        member = resolve(uid)
+        if member is None:
+            continue
+        total = sum(days.values())
+        week_emojis = "".join(
+            index.lookup(sum(days.get(d, 0) for d in week if d != 0))[0] for week in weeks
+        )
+        rows.append((member, total, week_emojis))
+
+    rows.sort(key=lambda x: x[1], reverse=True)
+    return rows
+
+
+def render_monthly_report(rows, month):
+    if not rows:
+        return f"📅 {month}월 기록이 없어요."
+
+    lines = [
+        f"🗓 **{month}월 월간 결산**",
+        "한 달 동안 정말 수고하셨어요 👏\n",
+        "🏅 **이달의 순위**\n"
+    ]
+
+    for i, (member, total, week_emojis) in enumerate(rows):
+        medal = MEDALS[i] if i < 3 else f"{i+1}위"
+        lines.append(f"{medal} {member.display_name}   {fmt_time(total)}   {week_emojis}")
+
+    mvp = rows[0][0]
+    lines.append(f"\n🏆 **이달의 MVP**   {mvp.mention} ({fmt_time(rows[0][1])})")
+
+    for member, total, week_emojis in rows:
+        if "⬜" not in week_emojis:
+            lines.append(f"🔥 **개근상**   {member.mention} (한 주도 빠지지 않음!)")
+            break
+
+    if len(rows) > 1:
+        last = rows[-1][0]
+        lines.append(f"📈 **다음 달엔 더 달려봐요**   {last.mention} 💪")
+
+    lines.append(f"\n---\n{month}월 기록은 보관함으로 옮깁니다.\n{month % 12 + 1}월도 화이팅! 🚀")
+    return "\n".join(lines)
+
+
+async def build_report_text(db, year, month, resolve, guild_id=None, tiers=None):
+    daily = await fetch_month_daily_totals(db, year, month, guild_id)
+    return render_monthly_report(compute_monthly_report(daily, year, month, resolve, tiers), month)
+
+
+# ──────────────────────────────────────────
+# 오프라인 실행
+# ──────────────────────────────────────────
+async def _offline(path, year, month, guild_id):
+    def resolve(uid):
+        return OfflineMember(str(uid), f"<@{uid}>")
+
+    async with aiosqlite.connect(f"file:{path}?mode=ro", uri=True) as db:
+        return await build_report_text(db, year, month, resolve, guild_id)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (4, 5):
+        print("사용법: python report.py <DB 파일> <연도> <월> [guild_id]")
+        sys.exit(1)
+    guild_id = int(sys.argv[4]) if len(sys.argv) == 5 else None
+    print(asyncio.run(_offline(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), guild_id)))
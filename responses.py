@@ -0,0 +1,99 @@
+"""
+명령어 응답 캐시 — (guild_id, 명령어, user_id, 주) 키로 만들어 둔 응답을 TTL/LRU로 재사용
+
+    - 같은 키를 동시에 요청하면 계산은 한 번만 하고 결과를 나눠 쓴다 (in-flight 합치기)
+    - 퇴장, 월간 롤오버, 이름 변경, 설정 변경 때 invalidate — 그 사이에 시작된 계산 결과는 저장하지 않는다
+    - 같은 사람이 같은 명령어를 짧은 시간에 반복하면 cooldown() 이 True (응답을 다시 보내지 않음)
+
+길드 전체 응답(!현황)은 user_id 자리에 None 을 쓴다.
+"""
+
+import time
+import asyncio
+from collections import OrderedDict
+
+
+class ResponseCache:
+    def __init__(self, ttl=60, maxsize=256, cooldown=3, clock=time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.cooldown_seconds = cooldown
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (만료 시각, 값)
+        self._inflight = {}            # key -> Future
+        self._recent = {}              # (guild_id, 명령어, user_id) -> 마지막 요청 시각
+        self._generation = 0           # invalidate 마다 증가
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key, compute):
+        entry = self._entries.get(key)
+        if entry and entry[0] > self.clock():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        inflight = self._inflight.get(key)
+        if inflight:
+            self.hits += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        generation = self._generation
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # 기다리는 쪽이 없어도 경고가 남지 않게
+            raise
+        finally:
+            del self._inflight[key]
+
+        future.set_result(value)
+        if generation == self._generation:
+            self._store(key, value)
+        return value
+
+    def _store(self, key, value):
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def cooldown(self, guild_id, command, user_id):
+        # 직전 요청이 cooldown 초 안이면 True — 요청 시각은 매번 갱신하지 않는다 (연타해도 창이 늘지 않게)
+        key, now = (guild_id, command, user_id), self.clock()
+        last = self._recent.get(key)
+        if last is not None and now - last < self.cooldown_seconds:
+            return True
+        self._recent[key] = now
+        if len(self._recent) > self.maxsize * 4:
+            self._recent = {k: t for k, t in self._recent.items() if now - t < self.cooldown_seconds}
+        return False
+
+    # ── 무효화 ──
+    def _drop(self, match):
+        self._generation += 1
+        for key in [k for k in self._entries if match(k)]:
+            del self._entries[key]
+
+    def invalidate(self, guild_id, user_id=None):
+        # user_id 를 주면 그 사람의 응답과 길드 전체 응답(순위표에 그 사람이 들어 있으므로)만
+        if user_id is None:
+            self._drop(lambda k: k[0] == guild_id)
+        else:
+            self._drop(lambda k: k[0] == guild_id and k[2] in (None, user_id))
+
+    def invalidate_user(self, user_id):
+        # 전역 이름 변경 — 모든 길드의 그 사람 응답과 길드 전체 응답
+        self._drop(lambda k: k[2] in (None, user_id))
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -0,0 +1,102 @@
+"""
+월간 롤오버 — 지운 뒤 잊는 대신 요약 테이블로 압축하고 원본은 보관 파일로 내보낸다
+
+    1) daily_totals(guild_id, user_id, day, seconds) 를 원본 합계로 다시 맞춤
+       (평소에는 세션 저장 때 증분으로 올라가므로, 지우기 전에 원본 기준으로 확정)
+    2) (선택) 원본 행을 gzip JSONL 보관 파일로 내보내기 — 그 달 말일까지 남은 원본 전부
+    3) 원본 행 삭제 후 incremental vacuum (1~3의 삭제까지가 한 트랜잭션)
+"""
+
+import os
+import gzip
+import json
+import calendar
+from datetime import date
+from timeutil import to_epoch_day
+
+ROW_COLUMNS = ("id", "guild_id", "user_id", "check_in", "check_out", "duration", "day")
+
+
+def month_day_range(year, month):
+    first = to_epoch_day(date(year, month, 1))
+    return first, first + calendar.monthrange(year, month)[1] - 1
+
+
+async def export_raw_rows(db, guild_id, start_day, end_day, path, max_id, chunk_size=1000):
+    # 임시 파일에 다 쓴 뒤 이름을 바꿔서, 중간에 죽어도 반쪽짜리 보관 파일이 남지 않게
+    tmp_path = path + ".tmp"
+    count = 0
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        async with db.execute(
+            f"SELECT {', '.join(ROW_COLUMNS)} FROM attendance "
+            "WHERE guild_id = ? AND day BETWEEN ? AND ? AND id <= ? ORDER BY id",
+            (guild_id, start_day, end_day, max_id)
+        ) as cur:
+            while rows := await cur.fetchmany(chunk_size):
+                for row in rows:
+                    f.write(json.dumps(dict(zip(ROW_COLUMNS, row))) + "\n")
+                count += len(rows)
+    if count:
+        os.replace(tmp_path, path)
+    else:
+        # 이미 롤오버된 달을 다시 돌려도 기존 보관 파일을 빈 파일로 덮어쓰지 않게
+        os.remove(tmp_path)
+    return count
+
+
+async def compact_into_daily_totals(db, guild_id, start_day, end_day):
+    await db.execute("""
+        INSERT INTO daily_totals (guild_id, user_id, day, seconds)
+        SELECT guild_id, user_id, day, SUM(duration) FROM attendance
+        WHERE guild_id = ? AND day BETWEEN ? AND ? GROUP BY guild_id, user_id, day
+        ON CONFLICT (guild_id, user_id, day) DO UPDATE SET seconds = excluded.seconds
+    """, (guild_id, start_day, end_day))
+
+
+async def incremental_vacuum(db):
+    # 기존 DB는 auto_vacuum이 꺼져 있으므로 처음 한 번만 전체 VACUUM으로 모드를 바꾼다
+    async with db.execute("PRAGMA auto_vacuum") as cur:
+        mode = (await cur.fetchone())[0]
+    if mode != 2:
+        await db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        await db.execute("VACUUM")
+    else:
+        async with db.execute("PRAGMA incremental_vacuum") as cur:
+            await cur.fetchall()
+
+
+async def rollover_month(database, guild_id, year, month, archive_dir=None):
+    start_day, end_day = month_day_range(year, month)
+    archived, pruned = None, 0
+    if archive_dir:
+        os.makedirs(archive_dir, exist_ok=True)
+        path = os.path.join(archive_dir, f"attendance-{guild_id}-{year}-{month:02d}.jsonl.gz")
+
+    # 보관과 삭제는 이 달만이 아니라 end_day 까지 남아 있는 원본 전부 — 지난 롤오버 뒤에 들어온
+    # 그 전 달의 행(1일 결산 때 아직 작업방에 있던 사람의 마지막 날 몫 등)도 여기서 함께 처리된다.
+    # 한 쓰기 트랜잭션에서 같은 id 상한으로 보관하고 지우므로, 보관되지 않은 행이 지워지는 일은 없다.
+    async with database.write() as db:
+        # 합계는 이 달만 원본 기준으로 확정 — 그 전 날짜는 원본 일부가 이미 지워져 다시 더하면 줄어든다
+        # (늦게 들어온 행은 저장할 때 증분으로 이미 합계에 들어가 있다)
+        await compact_into_daily_totals(db, guild_id, start_day, end_day)
+        async with db.execute(
+            "SELECT MIN(day), MAX(id) FROM attendance WHERE guild_id = ? AND day <= ?", (guild_id, end_day)
+        ) as cur:
+            first_day, max_id = await cur.fetchone()
+        if archive_dir:
+            archived = await export_raw_rows(
+                db, guild_id, first_day or start_day, end_day, path, max_id or 0
+            )
+        if max_id is not None:
+            cur = await db.execute(
+                "DELETE FROM attendance WHERE guild_id = ? AND day BETWEEN ? AND ? AND id <= ?",
+                (guild_id, first_day, end_day, max_id)
+            )
+            pruned = cur.rowcount
+            await cur.close()
+
+    if database.dialect == "sqlite":
+        async with database.write() as db:
+            await incremental_vacuum(db)
+
+    return {"start_day": start_day, "end_day": end_day, "archived": archived, "pruned": pruned}
@@ -0,0 +1,95 @@
+"""
+장기 통계용 증분 롤업 — 세션을 저장할 때 같은 트랜잭션에서 합계 테이블도 함께 올린다
+
+    daily_totals  : (guild_id, user_id, day) 하루 합계 — 월간 롤오버로 원본을 지워도 남는다
+    hourly_totals : (guild_id, user_id, hour) 0~23시별 누적 — 시간대 분포
+
+통계 명령어는 원본 세션 대신 이 두 테이블만 읽으므로 사용자 한 명당 O(출석일 수)로 끝난다.
+"""
+
+from collections import defaultdict
+from datetime import date
+from timeutil import split_hours, to_epoch_day, from_epoch_day
+
+HEATMAP_BARS = "▁▂▃▄▅▆▇█"
+
+
+async def apply_rollups(db, rows):
+    # rows: split_sessions 결과 (guild_id, user_id, 시작, 끝, 길이, day) — 이미 날짜별로 잘려 있다
+    daily, hourly = defaultdict(float), defaultdict(float)
+    for guild_id, user_id, start, end, duration, day in rows:
+        daily[(guild_id, user_id, day)] += duration
+        for hour, seconds in split_hours(start, end):
+            hourly[(guild_id, user_id, hour)] += seconds
+    if daily:
+        await db.executemany(
+            "INSERT INTO daily_totals (guild_id, user_id, day, seconds) VALUES (?,?,?,?) "
+            "ON CONFLICT (guild_id, user_id, day) DO UPDATE SET seconds = daily_totals.seconds + excluded.seconds",
+            [(*key, seconds) for key, seconds in daily.items()]
+        )
+    if hourly:
+        await db.executemany(
+            "INSERT INTO hourly_totals (guild_id, user_id, hour, seconds) VALUES (?,?,?,?) "
+            "ON CONFLICT (guild_id, user_id, hour) DO UPDATE SET seconds = hourly_totals.seconds + excluded.seconds",
+            [(*key, seconds) for key, seconds in hourly.items()]
+        )
+
+
+# ──────────────────────────────────────────
+# 조회
+# ──────────────────────────────────────────
+async def fetch_user_days(db, guild_id, user_id):
+    # {epoch-day: 초} — 기본키 (guild_id, user_id, day) 범위 읽기
+    async with db.execute(
+        "SELECT day, seconds FROM daily_totals WHERE guild_id = ? AND user_id = ? AND seconds > 0",
+        (guild_id, user_id)
+    ) as cur:
+        return {day: seconds for day, seconds in await cur.fetchall()}
+
+
+async def fetch_user_hours(db, guild_id, user_id):
+    hours = [0.0] * 24
+    async with db.execute(
+        "SELECT hour, seconds FROM hourly_totals WHERE guild_id = ? AND user_id = ?", (guild_id, user_id)
+    ) as cur:
+        for hour, seconds in await cur.fetchall():
+            hours[hour] = seconds
+    return hours
+
+
+# ──────────────────────────────────────────
+# 계산 (메모리)
+# ──────────────────────────────────────────
+def streaks(days, today):
+    # (현재 연속 출석일, 최장 연속 출석일) — 오늘 아직 안 왔어도 어제까지 이어졌으면 현재로 친다
+    longest = run = 0
+    prev = None
+    for day in sorted(days):
+        run = run + 1 if prev == day - 1 else 1
+        longest = max(longest, run)
+        prev = day
+    current = run if prev is not None and prev >= to_epoch_day(today) - 1 else 0
+    return current, longest
+
+
+def best_week(days):
+    # (그 주 월요일, 초) — 1970-01-01이 목요일이라 (day + 3) % 7 이 월요일부터 센 요일
+    weeks = defaultdict(float)
+    for day, seconds in days.items():
+        weeks[day - (day + 3) % 7] += seconds
+    if not weeks:
+        return None
+    monday = max(weeks, key=weeks.get)
+    return from_epoch_day(monday), weeks[monday]
+
+
+def year_total(days, year):
+    first, last = to_epoch_day(date(year, 1, 1)), to_epoch_day(date(year, 12, 31))
+    return sum(seconds for day, seconds in days.items() if first <= day <= last)
+
+
+def heatmap(hours):
+    peak = max(hours)
+    if not peak:
+        return HEATMAP_BARS[0] * 24
+    return "".join(HEATMAP_BARS[min(7, int(h / peak * 8))] for h in hours)
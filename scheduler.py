@@ -0,0 +1,153 @@
+"""
+정시 스케줄러 — 다음 실행 시각(KST)까지 정확히 잠들고,
+마지막 실행 기록을 SQLite에 남겨 재시작/다운타임 뒤에도 놓친 작업을 한 번 따라잡는다
+
+시계(clock)와 sleep을 주입할 수 있어서 실제 시간을 기다리지 않고 시험할 수 있다.
+"""
+
+import asyncio
+import traceback
+from datetime import datetime, timedelta
+from timeutil import KST
+
+
+class WeeklyAt:
+    def __init__(self, weekday, hour, minute=0):
+        self.weekday, self.hour, self.minute = weekday, hour, minute
+
+    def last_due(self, now):
+        due = now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        due -= timedelta(days=(now.weekday() - self.weekday) % 7)
+        if due > now:
+            due -= timedelta(days=7)
+        return due
+
+    def next_due(self, now):
+        return self.last_due(now) + timedelta(days=7)
+
+
+class MonthlyAt:
+    def __init__(self, day, hour, minute=0):
+        self.day, self.hour, self.minute = day, hour, minute
+
+    def _in_month(self, year, month, tz):
+        return datetime(year, month, self.day, self.hour, self.minute, tzinfo=tz)
+
+    def last_due(self, now):
+        due = self._in_month(now.year, now.month, now.tzinfo)
+        if due > now:
+            year, month = (now.year, now.month - 1) if now.month > 1 else (now.year - 1, 12)
+            due = self._in_month(year, month, now.tzinfo)
+        return due
+
+    def next_due(self, now):
+        last = self.last_due(now)
+        year, month = (last.year, last.month + 1) if last.month < 12 else (last.year + 1, 1)
+        return self._in_month(year, month, now.tzinfo)
+
+
+class Job:
+    def __init__(self, name, schedule, func):
+        self.name = name
+        self.schedule = schedule
+        self.func = func  # async func(due: datetime)
+
+
+class Scheduler:
+    def __init__(self, database, jobs, clock=None, sleep=asyncio.sleep,
+                 retry_delay=300, max_sleep=3600):
+        self.database = database
+        self.jobs = jobs
+        self.clock = clock or (lambda: datetime.now(KST))
+        self.sleep = sleep
+        self.retry_delay = retry_delay
+        self.max_sleep = max_sleep  # 시스템 시계가 바뀌어도 너무 오래 잠들지 않게
+        self._task = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    async def _load_markers(self):
+        async with self.database.read() as db:
+            async with db.execute("SELECT job, last_due FROM scheduler_runs") as cur:
+                return {job: last_due for job, last_due in await cur.fetchall()}
+
+    async def _mark(self, job, due):
+        async with self.database.write() as db:
+            await db.execute(
+                "INSERT INTO scheduler_runs (job, last_due, ran_at) VALUES (?,?,?) "
+                "ON CONFLICT (job) DO UPDATE SET last_due = excluded.last_due, ran_at = excluded.ran_at",
+                (job, due.timestamp(), self.clock().timestamp())
+            )
+
+    async def has_run(self, name, due):
+        async with self.database.read() as db:
+            async with db.execute("SELECT last_due FROM scheduler_runs WHERE job=?", (name,)) as cur:
+                row = await cur.fetchone()
+        return row is not None and row[0] >= due.timestamp()
+
+    async def run_once(self, name, due, func):
+        # 작업 안의 하위 단위(예: 길드별 결산)를 예정 시각당 한 번만 실행 — 재시도 때 중복 방지
+        if await self.has_run(name, due):
+            return False
+        await func()
+        await self._mark(name, due)
+        return True
+
+    async def run_pending(self):
+        # 마지막 예정 시각이 기록보다 나중이면 실행 — 여러 번 놓쳤어도 가장 최근 것 한 번만
+        markers = await self._load_markers()
+        now = self.clock()
+        failed = False
+        for job in self.jobs:
+            due = job.schedule.last_due(now)
+            last = markers.get(job.name)
+            if last is None:
+                # 처음 보는 작업: 과거 실행분을 갑자기 올리지 않도록 기준점만 기록
+                await self._mark(job.name, due)
+                continue
+            if last >= due.timestamp():
+                continue
+            try:
+                await job.func(due)
+            except Exception:
+                failed = True
+                print(f"스케줄 작업 실패: {job.name}")
+                traceback.print_exc()
+                continue
+            await self._mark(job.name, due)
+        return not failed
+
+    def seconds_until_next(self, ok=True):
+        now = self.clock()
+        next_due = min(job.schedule.next_due(now) for job in self.jobs)
+        delay = (next_due - now).total_seconds()
+        if not ok:
+            delay = min(delay, self.retry_delay)
+        return max(0.0, min(delay, self.max_sleep))
+
+    async def run_forever(self):
+        while True:
+            try:
+                ok = await self.run_pending()
+            except Exception:
+                # 작업 밖(기록 읽기/쓰기 등)에서 난 오류도 루프를 끝내지 않고 retry_delay 뒤 다시
+                print("스케줄러 오류 — 잠시 후 다시 시도")
+                traceback.print_exc()
+                ok = False
+            await self.sleep(self.seconds_until_next(ok))
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.create_task(self.run_forever())
+        return self._task
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
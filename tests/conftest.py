@@ -0,0 +1,21 @@
+import os
+import sys
+import pytest
+
+# 모듈이 저장소 최상위에 평평하게 있으므로 tests/ 에서도 바로 import 되게
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import Database  # noqa: E402
+import migrations  # noqa: E402
+
+
+@pytest.fixture
+def open_db(tmp_path):
+    # 테스트마다 새 SQLite 파일 — 이벤트 루프에 묶이므로 asyncio.run 안에서 연다
+    async def _open(name="attendance.db"):
+        database = Database(str(tmp_path / name), readers=2)
+        await database.open()
+        async with database.write() as db:
+            await migrations.migrate(db)
+        return database
+    return _open
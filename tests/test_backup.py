@@ -0,0 +1,76 @@
+import gzip
+import json
+import asyncio
+import pytest
+import backup
+
+
+async def fetch(database, sql):
+    async with database.read() as db:
+        async with db.execute(sql) as cur:
+            return await cur.fetchall()
+
+
+def write_jsonl(path, records):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for record in records:
+            f.write((record if isinstance(record, str) else json.dumps(record)) + "\n")
+
+
+def session(user_id, check_in, duration=600, day=20000):
+    return {"guild_id": 1, "user_id": user_id, "check_in": check_in,
+            "check_out": check_in + duration, "duration": duration, "day": day}
+
+
+def test_export_then_import_round_trip_is_idempotent(open_db, tmp_path):
+    source = str(tmp_path / "in.jsonl.gz")
+    write_jsonl(source, [session(7, 100.0), session(8, 200.0, 300)])
+
+    async def scenario():
+        database = await open_db()
+        assert backup.validate_file(source) == 2
+        assert await backup.import_attendance(database, backup.read_rows(source)) == {"read": 2, "inserted": 2}
+        assert await backup.import_attendance(database, backup.read_rows(source)) == {"read": 2, "inserted": 0}
+        assert await fetch(database, "SELECT user_id, seconds FROM daily_totals ORDER BY user_id") == [(7, 600), (8, 300)]
+
+        exported = str(tmp_path / "out.csv.gz")
+        async with database.read() as db:
+            assert await backup.export_attendance(db, exported, guild_id=1) == 2
+        assert [row[1] for row in backup.read_rows(exported)] == [7, 8]
+        await database.close()
+    asyncio.run(scenario())
+
+
+def test_broken_row_is_rejected_before_anything_is_written(open_db, tmp_path):
+    source = str(tmp_path / "in.jsonl.gz")
+    write_jsonl(source, [session(7, 100.0), {"guild_id": 1, "user_id": "abc"}, session(8, 200.0)])
+
+    async def scenario():
+        database = await open_db()
+        with pytest.raises(ValueError, match="2번째"):
+            backup.validate_file(source)
+        assert await fetch(database, "SELECT COUNT(*) FROM attendance") == [(0,)]
+        await database.close()
+    asyncio.run(scenario())
+
+
+def test_unreadable_file_is_a_value_error(tmp_path):
+    truncated = tmp_path / "in.csv.gz"
+    truncated.write_bytes(gzip.compress(b"guild_id,user_id\n1,2\n")[:-8])
+    with pytest.raises(ValueError):
+        backup.validate_file(str(truncated))
+    with pytest.raises(ValueError):
+        backup.validate_file(str(tmp_path / "in.txt"))
+
+
+def test_partial_import_still_compacts_committed_chunks(open_db, tmp_path):
+    source = str(tmp_path / "in.jsonl.gz")
+    write_jsonl(source, [session(7, 100.0), session(7, 800.0), '{"user_id": 9}'])
+
+    async def scenario():
+        database = await open_db()
+        with pytest.raises(ValueError):
+            await backup.import_attendance(database, backup.read_rows(source), chunk_size=2)
+        assert await fetch(database, "SELECT user_id, seconds FROM daily_totals") == [(7, 1200)]
+        await database.close()
+    asyncio.run(scenario())
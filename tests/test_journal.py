@@ -0,0 +1,134 @@
+import asyncio
+import pytest
+from journal import SessionJournal
+
+
+async def record_closed(db, closed):
+    await db.executemany(
+        "INSERT INTO attendance (guild_id, user_id, check_in, check_out, duration, day) VALUES (?,?,?,?,?,0)",
+        [(gid, uid, check_in, check_out, check_out - check_in) for gid, uid, check_in, check_out in closed]
+    )
+
+
+def make_journal(database, path, on_close=record_closed):
+    # 자동 flush 는 끄고 테스트가 직접 부른다
+    return SessionJournal(database, str(path), on_close, flush_interval=3600, flush_events=10**6)
+
+
+def crash(journal):
+    # flush 없이 프로세스가 죽은 것처럼 — 파일만 닫고 백그라운드 태스크를 버린다
+    journal._task.cancel()
+    journal._file.close()
+
+
+async def fetch(database, sql):
+    async with database.read() as db:
+        async with db.execute(sql) as cur:
+            return await cur.fetchall()
+
+
+def test_replays_unflushed_events_after_crash(open_db, tmp_path):
+    async def scenario():
+        database = await open_db()
+        path = tmp_path / "sessions.journal"
+        journal = make_journal(database, path)
+        await journal.open()
+        journal.join(1, 7, 100.0)
+        journal.leave(1, 7, 160.0)
+        journal.join(1, 8, 200.0)
+        crash(journal)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"op": "join", "guild_id": 1, "us')  # 쓰다 만 마지막 줄
+
+        restarted = make_journal(database, path)
+        await restarted.open()
+        assert await fetch(database, "SELECT guild_id, user_id, check_in, check_out FROM attendance") \
+            == [(1, 7, 100.0, 160.0)]
+        assert await fetch(database, "SELECT guild_id, user_id FROM active_sessions") == [(1, 8)]
+        assert (1, 8) in restarted.active and (1, 7) not in restarted.active
+        await restarted.close()
+        await database.close()
+    asyncio.run(scenario())
+
+
+def test_flushed_events_are_not_replayed_again(open_db, tmp_path):
+    async def scenario():
+        database = await open_db()
+        path = tmp_path / "sessions.journal"
+        journal = make_journal(database, path)
+        await journal.open()
+        journal.join(1, 7, 100.0)
+        journal.leave(1, 7, 160.0)
+        assert await journal.flush() == 2
+        journal.join(1, 7, 300.0)
+        crash(journal)
+
+        restarted = make_journal(database, path)
+        await restarted.open()
+        assert await fetch(database, "SELECT COUNT(*) FROM attendance") == [(1,)]
+        assert restarted.active.get((1, 7)) == 300.0
+        await restarted.close()
+        await database.close()
+    asyncio.run(scenario())
+
+
+def test_failed_flush_keeps_events_for_retry_and_replay(open_db, tmp_path):
+    async def scenario():
+        database = await open_db()
+        path = tmp_path / "sessions.journal"
+        failing = [True]
+
+        async def flaky(db, closed):
+            if failing[0]:
+                raise RuntimeError("database is locked")
+            await record_closed(db, closed)
+
+        journal = make_journal(database, path, flaky)
+        await journal.open()
+        journal.join(1, 7, 100.0)
+        journal.leave(1, 7, 160.0)
+        with pytest.raises(RuntimeError):
+            await journal.flush()
+        assert journal.depth() == 2
+        assert await fetch(database, "SELECT COUNT(*) FROM attendance") == [(0,)]
+
+        # 실패한 묶음이 남은 채로 새 이벤트가 더 들어오고 다시 실패한 뒤 크래시
+        journal.join(1, 8, 200.0)
+        with pytest.raises(RuntimeError):
+            await journal.flush()
+        crash(journal)
+
+        failing[0] = False
+        restarted = make_journal(database, path, flaky)
+        await restarted.open()
+        assert await fetch(database, "SELECT user_id, check_in, check_out FROM attendance") == [(7, 100.0, 160.0)]
+        assert await fetch(database, "SELECT user_id FROM active_sessions") == [(8,)]
+        await restarted.close()
+        await database.close()
+    asyncio.run(scenario())
+
+
+def test_retry_after_failed_flush_commits_once(open_db, tmp_path):
+    async def scenario():
+        database = await open_db()
+        failing = [True]
+
+        async def flaky(db, closed):
+            if failing[0]:
+                raise RuntimeError("disk I/O error")
+            await record_closed(db, closed)
+
+        journal = make_journal(database, tmp_path / "sessions.journal", flaky)
+        await journal.open()
+        journal.join(1, 7, 100.0)
+        journal.leave(1, 7, 160.0)
+        with pytest.raises(RuntimeError):
+            await journal.flush()
+        failing[0] = False
+        assert await journal.flush() == 2
+        assert await journal.flush() == 0
+        assert await fetch(database, "SELECT COUNT(*) FROM attendance") == [(1,)]
+        assert not (tmp_path / "sessions.journal.flushing").exists()
+        await journal.close()
+        await database.close()
+    asyncio.run(scenario())
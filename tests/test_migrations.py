@@ -0,0 +1,60 @@
+import os
+import shutil
+import asyncio
+from datetime import date, datetime
+import migrations
+from timeutil import KST, to_epoch_day
+
+# 저장소에 들어 있는 v0(최초 스키마) DB — 원본은 건드리지 않고 복사본을 올린다
+LEGACY_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "attendance.db")
+
+
+async def fetch(database, sql):
+    async with database.read() as db:
+        async with db.execute(sql) as cur:
+            return await cur.fetchall()
+
+
+def test_migrates_checked_in_database_from_v0(open_db, tmp_path):
+    shutil.copy(LEGACY_DB, tmp_path / "attendance.db")
+
+    async def scenario():
+        database = await open_db()
+        async with database.read() as db:
+            assert await migrations.get_version(db) == migrations.SCHEMA_VERSION == 9
+
+        rows = await fetch(database, "SELECT id, guild_id, user_id, check_in, check_out, duration, day FROM attendance ORDER BY id")
+        assert [r[0] for r in rows] == [867, 868, 869, 870]
+        day = to_epoch_day(date(2025, 7, 6))
+        first = rows[0]
+        assert first[1:3] == (0, 805463906620669972)
+        assert first[3] == datetime(2025, 7, 6, 21, 9, 3, 84419, tzinfo=KST).timestamp()
+        assert first[5] == 351 and first[6] == day
+
+        totals = dict(((uid, d), s) for uid, d, s in await fetch(
+            database, "SELECT user_id, day, seconds FROM daily_totals WHERE guild_id=0"
+        ))
+        assert totals == {
+            (805463906620669972, day): 351 + 6034 + 517,
+            (900000344602443857, day): 5275,
+        }
+        assert await fetch(database, "SELECT COUNT(*) FROM active_sessions") == [(0,)]
+        assert await fetch(database, "SELECT name, applied_seq FROM journal_state") == []
+
+        # 다시 올려도 아무 단계도 적용되지 않는다
+        async with database.write() as db:
+            assert await migrations.migrate(db) == []
+        await database.close()
+    asyncio.run(scenario())
+
+
+def test_fresh_database_gets_every_step(open_db):
+    async def scenario():
+        database = await open_db()
+        tables = {name for name, in await fetch(database, "SELECT name FROM sqlite_master WHERE type='table'")}
+        assert {"attendance", "active_sessions", "daily_totals", "hourly_totals", "scheduler_runs",
+                "journal_state", "guild_config", "leases"} <= tables
+        indexes = {name for name, in await fetch(database, "SELECT name FROM sqlite_master WHERE type='index'")}
+        assert "uq_attendance_session" in indexes
+        await database.close()
+    asyncio.run(scenario())
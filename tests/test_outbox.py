@@ -0,0 +1,104 @@
+import asyncio
+from outbox import Outbox, split_message
+
+
+class FakeChannel:
+    def __init__(self, id=1, fail=False):
+        self.id = id
+        self.fail = fail
+        self.sent = []
+
+    async def send(self, content=None, embed=None):
+        if self.fail:
+            raise RuntimeError("403 Forbidden")
+        self.sent.append(content)
+
+
+def make_outbox(**kwargs):
+    # 합치기 창은 테스트가 gate 를 열 때 끝난다
+    gate = asyncio.Event()
+
+    async def sleep(seconds):
+        await gate.wait()
+
+    return Outbox(sleep=sleep, **kwargs), gate
+
+
+def test_coalesces_announcements_and_keeps_last_milestone():
+    async def scenario():
+        outbox, gate = make_outbox()
+        channel = FakeChannel()
+        outbox.announce(channel, "A 입장")
+        outbox.milestone(channel, "지금 3명")
+        outbox.announce(channel, "B 입장")
+        outbox.milestone(channel, "지금 4명")
+        await asyncio.sleep(0)
+        assert channel.sent == []
+
+        gate.set()
+        await outbox.drain()
+        assert channel.sent == ["A 입장\nB 입장\n지금 4명"]
+        assert outbox.stats()["coalesced"] == 3
+        assert outbox.sent == 1
+    asyncio.run(scenario())
+
+
+def test_send_flushes_pending_lines_first():
+    async def scenario():
+        outbox, gate = make_outbox()
+        channel = FakeChannel()
+        outbox.announce(channel, "A 입장")
+        outbox.send(channel, "주간 리포트")
+        outbox.announce(channel, "B 입장")
+        gate.set()
+        await outbox.drain()
+        assert channel.sent == ["A 입장", "주간 리포트", "B 입장"]
+    asyncio.run(scenario())
+
+
+def test_channels_are_coalesced_separately():
+    async def scenario():
+        outbox, gate = make_outbox()
+        first, second = FakeChannel(1), FakeChannel(2)
+        outbox.announce(first, "A 입장")
+        outbox.announce(second, "B 입장")
+        outbox.announce(first, "C 입장")
+        gate.set()
+        await outbox.drain()
+        assert first.sent == ["A 입장\nC 입장"]
+        assert second.sent == ["B 입장"]
+    asyncio.run(scenario())
+
+
+def test_full_queue_drops_and_failed_send_is_counted():
+    async def scenario():
+        outbox, _ = make_outbox(maxsize=2)
+        channel = FakeChannel()
+        assert outbox.send(channel, "1")
+        assert outbox.send(channel, "2")
+        assert not outbox.send(channel, "3")
+        await outbox.drain()
+        assert channel.sent == ["1", "2"]
+        assert outbox.dropped == 1
+
+        broken = FakeChannel(2, fail=True)
+        outbox.send(broken, "x")
+        await outbox.drain()
+        assert outbox.failed == 1 and outbox.depth() == 0
+    asyncio.run(scenario())
+
+
+def test_stop_sends_pending_lines_without_waiting_for_window():
+    async def scenario():
+        outbox, _ = make_outbox()
+        channel = FakeChannel()
+        outbox.announce(channel, "A 퇴장")
+        await outbox.stop(timeout=1)
+        assert channel.sent == ["A 퇴장"]
+    asyncio.run(scenario())
+
+
+def test_split_message_respects_limit():
+    lines = ["a" * 8, "b" * 8, "c" * 8]
+    assert split_message(lines, limit=17) == ["a" * 8 + "\n" + "b" * 8, "c" * 8]
+    assert split_message(["x" * 30], limit=10) == ["x" * 10]
@@ -0,0 +1,128 @@
+import asyncio
+import contextlib
+from datetime import datetime, timedelta
+from scheduler import Scheduler, Job, WeeklyAt, MonthlyAt
+from timeutil import KST
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_last_due_and_next_due():
+    weekly = WeeklyAt(weekday=0, hour=9)
+    wed = datetime(2026, 10, 14, 12, tzinfo=KST)
+    assert weekly.last_due(wed) == datetime(2026, 10, 12, 9, tzinfo=KST)
+    assert weekly.next_due(wed) == datetime(2026, 10, 19, 9, tzinfo=KST)
+    assert weekly.last_due(datetime(2026, 10, 12, 8, 59, tzinfo=KST)) == datetime(2026, 10, 5, 9, tzinfo=KST)
+
+    monthly = MonthlyAt(day=1, hour=9)
+    assert monthly.last_due(datetime(2026, 1, 1, 8, tzinfo=KST)) == datetime(2025, 12, 1, 9, tzinfo=KST)
+    assert monthly.next_due(datetime(2026, 12, 5, tzinfo=KST)) == datetime(2027, 1, 1, 9, tzinfo=KST)
+
+
+def test_first_run_only_sets_baseline_then_catches_up_once(open_db):
+    async def scenario():
+        database = await open_db()
+        clock = FakeClock(datetime(2026, 10, 5, 8, tzinfo=KST))
+        runs = []
+
+        async def job(due):
+            runs.append(due)
+
+        scheduler = Scheduler(database, [Job("weekly", WeeklyAt(weekday=0, hour=9), job)], clock=clock)
+        assert await scheduler.run_pending()
+        assert runs == []  # 처음 보는 작업은 지난 예정분을 올리지 않는다
+
+        # 3주 동안 꺼져 있었다 — 가장 최근 예정분 한 번만
+        clock.now = datetime(2026, 10, 27, 10, tzinfo=KST)
+        assert await scheduler.run_pending()
+        assert runs == [datetime(2026, 10, 26, 9, tzinfo=KST)]
+
+        assert await scheduler.run_pending()
+        assert len(runs) == 1
+        await database.close()
+    asyncio.run(scenario())
+
+
+def test_failed_job_is_retried_after_retry_delay(open_db):
+    async def scenario():
+        database = await open_db()
+        clock = FakeClock(datetime(2026, 10, 5, 8, tzinfo=KST))
+        attempts = []
+
+        async def job(due):
+            attempts.append(due)
+            if len(attempts) == 1:
+                raise RuntimeError("discord unavailable")
+
+        scheduler = Scheduler(database, [Job("weekly", WeeklyAt(weekday=0, hour=9), job)],
+                              clock=clock, retry_delay=300)
+        await scheduler.run_pending()
+        clock.now = datetime(2026, 10, 5, 9, 0, 1, tzinfo=KST)
+
+        ok = await scheduler.run_pending()
+        assert not ok
+        assert scheduler.seconds_until_next(ok) == 300
+
+        clock.now += timedelta(seconds=300)
+        assert await scheduler.run_pending()
+        assert await scheduler.run_pending()
+        assert len(attempts) == 2 and attempts[0] == attempts[1]
+        await database.close()
+    asyncio.run(scenario())
+
+
+def test_run_once_runs_each_unit_once_per_due(open_db):
+    async def scenario():
+        database = await open_db()
+        scheduler = Scheduler(database, [])
+        due = datetime(2026, 10, 5, 9, tzinfo=KST)
+        calls = []
+
+        async def unit():
+            calls.append(1)
+
+        assert await scheduler.run_once("weekly:1", due, unit)
+        assert not await scheduler.run_once("weekly:1", due, unit)
+        assert await scheduler.has_run("weekly:1", due)
+        assert not await scheduler.has_run("weekly:2", due)
+        assert await scheduler.run_once("weekly:1", due + timedelta(days=7), unit)
+        assert len(calls) == 2
+        await database.close()
+    asyncio.run(scenario())
+
+
+def test_loop_survives_bookkeeping_errors():
+    class LockedDatabase:
+        @contextlib.asynccontextmanager
+        async def read(self):
+            raise RuntimeError("database is locked")
+            yield
+
+        write = read
+
+    async def scenario():
+        delays = []
+
+        async def sleep(seconds):
+            delays.append(seconds)
+            if len(delays) == 3:
+                raise asyncio.CancelledError
+
+        async def job(due):
+            pass
+
+        scheduler = Scheduler(LockedDatabase(), [Job("weekly", WeeklyAt(weekday=0, hour=9), job)],
+                              sleep=sleep, retry_delay=300)
+        scheduler.start()
+        try:
+            await scheduler._task
+        except asyncio.CancelledError:
+            pass
+        assert delays == [300, 300, 300]
+    asyncio.run(scenario())
@@ -0,0 +1,59 @@
+from datetime import datetime, date
+from timeutil import KST, split_interval, split_sessions, epoch_day_of, to_epoch_day
+
+
+def ts(*args):
+    return datetime(*args, tzinfo=KST).timestamp()
+
+
+def day(*args):
+    return to_epoch_day(date(*args))
+
+
+def test_session_within_one_day_is_not_split():
+    start, end = ts(2026, 10, 15, 21), ts(2026, 10, 15, 23, 59, 59)
+    assert split_interval(start, end) == [(start, end, day(2026, 10, 15))]
+
+
+def test_session_crossing_kst_midnight_splits_at_midnight():
+    start, end = ts(2026, 10, 15, 23, 30), ts(2026, 10, 16, 0, 45)
+    midnight = ts(2026, 10, 16)
+    assert split_interval(start, end) == [
+        (start, midnight, day(2026, 10, 15)),
+        (midnight, end, day(2026, 10, 16)),
+    ]
+    # UTC 자정(KST 09:00)에서는 자르지 않는다
+    assert len(split_interval(ts(2026, 10, 16, 8), ts(2026, 10, 16, 10))) == 1
+
+
+def test_session_ending_exactly_at_midnight_stays_on_previous_day():
+    start, midnight = ts(2026, 10, 15, 23), ts(2026, 10, 16)
+    assert epoch_day_of(midnight) == day(2026, 10, 16)
+    assert split_interval(start, midnight) == [(start, midnight, day(2026, 10, 15))]
+
+
+def test_session_starting_exactly_at_midnight():
+    midnight, end = ts(2026, 10, 16), ts(2026, 10, 16, 1)
+    assert split_interval(midnight, end) == [(midnight, end, day(2026, 10, 16))]
+
+
+def test_multi_day_session_covers_whole_days():
+    start, end = ts(2026, 10, 14, 22), ts(2026, 10, 17, 2)
+    pieces = split_interval(start, end)
+    assert [d for _, _, d in pieces] == [day(2026, 10, 14), day(2026, 10, 15), day(2026, 10, 16), day(2026, 10, 17)]
+    assert [e - s for s, e, _ in pieces] == [2 * 3600, 86400, 86400, 2 * 3600]
+    assert all(a[1] == b[0] for a, b in zip(pieces, pieces[1:]))
+
+
+def test_end_before_start_is_an_empty_piece():
+    start = ts(2026, 10, 15, 12)
+    assert split_interval(start, start - 60) == [(start, start, day(2026, 10, 15))]
+
+
+def test_split_sessions_keeps_key_columns():
+    start, end = ts(2026, 10, 15, 23), ts(2026, 10, 16, 1)
+    midnight = ts(2026, 10, 16)
+    assert split_sessions([(1, 7, start, end)]) == [
+        (1, 7, start, midnight, 3600, day(2026, 10, 15)),
+        (1, 7, midnight, end, 3600, day(2026, 10, 16)),
+    ]
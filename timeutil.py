@@ -0,0 +1,77 @@
+"""
+시간 관련 공용 헬퍼
+"""
+
+from datetime import date, timedelta, timezone
+
+KST = timezone(timedelta(hours=9))
+
+
+def fmt_time(seconds):
+    h, r = divmod(int(seconds), 3600)
+    m, _ = divmod(r, 60)
+    return f"{h}시간 {m:02d}분"
+
+
+def get_week_dates(ref_date):
+    monday = ref_date - timedelta(days=ref_date.weekday())
+    return [monday + timedelta(days=i) for i in range(7)]
+
+
+# ── epoch-day: KST 기준 1970-01-01부터 센 날짜 번호 (DB의 day 컬럼) ──
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_KST_OFFSET = 9 * 3600
+
+
+def to_epoch_day(d):
+    return d.toordinal() - _EPOCH_ORDINAL
+
+
+def from_epoch_day(n):
+    return date.fromordinal(n + _EPOCH_ORDINAL)
+
+
+def epoch_day_of(ts):
+    return int((ts + _KST_OFFSET) // 86400)
+
+
+# ── 세션을 KST 자정 기준으로 쪼개기 (epoch 초 → (시작, 끝, epoch-day) 튜플) ──
+DAY_SECONDS = 86400
+
+
+def split_interval(start_ts, end_ts):
+    end_ts = max(end_ts, start_ts)
+    day, last = epoch_day_of(start_ts), epoch_day_of(end_ts)
+    if day == last:
+        return [(start_ts, end_ts, day)]
+
+    pieces = [(start_ts, (day + 1) * DAY_SECONDS - _KST_OFFSET, day)]
+    for d in range(day + 1, last):
+        pieces.append((d * DAY_SECONDS - _KST_OFFSET, (d + 1) * DAY_SECONDS - _KST_OFFSET, d))
+    last_start = last * DAY_SECONDS - _KST_OFFSET
+    if end_ts > last_start:
+        pieces.append((last_start, end_ts, last))
+    return pieces
+
+
+def split_hours(start_ts, end_ts):
+    # [(KST 시각 0~23, 초)] — 정시마다 자른다 (KST는 정시 단위 오프셋이라 epoch 정시와 맞음)
+    pieces = []
+    t = start_ts
+    while t < end_ts:
+        hour = (t + _KST_OFFSET) // 3600
+        e = min((hour + 1) * 3600 - _KST_OFFSET, end_ts)
+        pieces.append((int(hour) % 24, e - t))
+        t = e
+    return pieces
+
+
+def split_sessions(sessions):
+    # [(*키, 시작, 끝), ...] → executemany용 (*키, 시작, 끝, 길이, day) 행
+    # 키는 (user_id,) 나 (guild_id, user_id) 처럼 앞쪽 컬럼을 그대로 붙인다
+    rows = []
+    append = rows.append
+    for *key, start_ts, end_ts in sessions:
+        for s, e, d in split_interval(start_ts, end_ts):
+            append((*key, s, e, e - s, d))
+    return rows